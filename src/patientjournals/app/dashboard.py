@@ -186,15 +186,13 @@ def _flatten_mapping(
     value: dict[str, object],
     *,
     prefix: str = "",
+    out: dict[str, object] | None = None,
 ) -> dict[str, object]:
-    flat: dict[str, object] = {}
+    flat: dict[str, object] = {} if out is None else out
     for key, item in value.items():
         path = f"{prefix}.{key}" if prefix else str(key)
-        if isinstance(item, dict):
-            if item:
-                flat.update(_flatten_mapping(item, prefix=path))
-            else:
-                flat[path] = item
+        if isinstance(item, dict) and item:
+            _flatten_mapping(item, prefix=path, out=flat)
         else:
             flat[path] = item
     return flat
@@ -208,11 +206,11 @@ def analyze_dataset_file(
     path = Path(dataset_path).expanduser()
     rows = _dataset_rows(path)
     flat_rows = [_flatten_mapping(row) for row in rows]
-    columns: list[str] = []
-    for row in flat_rows:
-        for key in row:
-            if key not in columns:
-                columns.append(str(key))
+    columns = list(dict.fromkeys(key for row in flat_rows for key in row))
+    # One pass over the rows instead of one per column.
+    populated_by_column = Counter(
+        key for row in flat_rows for key, value in row.items() if _is_populated(value)
+    )
 
     row_count = len(rows)
     failed_rows = sum(1 for row in rows if _truthy(row.get("failed")))
@@ -220,7 +218,7 @@ def analyze_dataset_file(
     schema_completeness: list[DatasetColumnSummary] = []
     metadata_completeness: list[DatasetColumnSummary] = []
     for column in columns:
-        populated = sum(1 for row in flat_rows if _is_populated(row.get(column)))
+        populated = populated_by_column[column]
         missing = max(0, row_count - populated)
         summary = DatasetColumnSummary(
             column=column,
@@ -23,10 +23,10 @@ from patientjournals.data.bucket import (
 )
 from patientjournals.data.inspection import collect_files, summarize_batch_data
 from patientjournals.shared.identity import (
-    build_image_name_set,
     duplicate_image_names,
     ensure_row_image_name,
     image_name_from_reference,
+    image_names_with_duplicates,
     row_image_name,
 )
 
@@ -371,8 +371,9 @@ def combine_dataset_files(
         )
 
     with open(dataset_path, "w", encoding="utf-8") as handle:
-        for row in output_rows:
-            handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+        handle.writelines(
+            json.dumps(row, ensure_ascii=False) + "\n" for row in output_rows
+        )
 
     manifest: dict[str, Any] = {
         "schema_version": 1,
@@ -744,15 +745,15 @@ def resolve_local_images_on_cloud(
         recursive=recursive,
     )
     local_refs = [str(path) for path in image_files]
-    local_names = build_image_name_set(local_refs)
-    local_duplicates = tuple(sorted(duplicate_image_names(local_refs)))
+    local_names, local_duplicate_set = image_names_with_duplicates(local_refs)
+    local_duplicates = tuple(sorted(local_duplicate_set))
 
     bucket = build_storage_bucket(bucket_name)
     blobs = list_bucket_blobs(bucket, prefix=normalize_prefix(cloud_prefix))
     image_blobs = select_bucket_image_blobs(blobs, glob_pattern=glob_pattern)
     cloud_refs = [str(getattr(blob, "name", "") or "") for blob in image_blobs]
-    cloud_names = build_image_name_set(cloud_refs)
-    cloud_duplicates = tuple(sorted(duplicate_image_names(cloud_refs)))
+    cloud_names, cloud_duplicate_set = image_names_with_duplicates(cloud_refs)
+    cloud_duplicates = tuple(sorted(cloud_duplicate_set))
 
     matched = local_names & cloud_names
     missing = tuple(sorted(local_names - cloud_names))
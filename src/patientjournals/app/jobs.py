@@ -30,7 +30,7 @@ from patientjournals.config.models import resolve_model_spec
 from patientjournals.config.schemas import resolve_output_schema
 from patientjournals.local.service import LocalRunRequest, LocalRunResult, run_local_job
 from patientjournals.shared.dataset_coverage import load_dataset_image_coverage
-from patientjournals.shared.identity import image_name_from_reference
+from patientjournals.shared.identity import image_name_from_reference, row_image_name
 from patientjournals.shared.processing_metrics import (
     MANIFEST_FILE_NAME,
     append_processing_record,
@@ -494,7 +494,7 @@ def finalize_dataset_with_failed_rows(
     files, the current dataset, and the processing manifest.
     """
     from patientjournals.batch import retrieve as retrieve_module
-    from patientjournals.shared.tools import get_run_logger, load_existing_dataset
+    from patientjournals.shared.tools import _normalize_output_format, get_run_logger
 
     recorded = read_recorded_results(run_dir)
     dataset_path_value = find_dataset_near(recorded.get("dataset_path") or "")
@@ -519,10 +519,6 @@ def finalize_dataset_with_failed_rows(
             for item in (batch_meta.get("batch_jobs") or [])
             if item.get("batch_job_name")
         ]
-        output_format, covered_names, _existing_count = load_existing_dataset(
-            dataset_path,
-            csv_sep=config.csv_sep,
-        )
         expected_keys = retrieve_module._resolve_expected_request_keys(
             submit_run_dir=run_path,
             batch_names=batch_names,
@@ -541,10 +537,16 @@ def finalize_dataset_with_failed_rows(
         def basename(key: str) -> str:
             return image_name_from_reference(key) or key
 
+        # The rows are needed for the rewrite anyway; derive coverage from them
+        # instead of parsing the dataset a second time.
+        if not dataset_path.is_file():
+            raise FileNotFoundError(f"dataset not found or not a file: {dataset_path}")
+        output_format = _normalize_output_format(dataset_path.suffix.lstrip("."))
+        rows = _dataset_rows(dataset_path, output_format)
+        covered_names = {name for name in map(row_image_name, rows) if name}
         missing_keys = {
             key for key in expected_keys if basename(key) not in covered_names
         }
-        rows = _dataset_rows(dataset_path, output_format)
         changed = False
         for row in rows:
             if "failed" not in row:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import fnmatch
 import json
+import os
 from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
@@ -34,7 +35,13 @@ from patientjournals.shared.identity import (
     build_image_name_set,
     image_name_from_reference,
 )
-from patientjournals.shared.tools import create_subfolder, flush_rows, get_run_logger
+from patientjournals.shared.tools import (
+    DatasetWriter,
+    _glob_match,
+    _jsonl_line,
+    create_subfolder,
+    get_run_logger,
+)
 
 
 @dataclass
@@ -129,12 +136,13 @@ def list_prediction_output_blobs(
 ) -> list[object]:
     normalized_prefix = normalize_prefix(prefix)
     blobs = list_bucket_blobs(bucket, prefix=normalized_prefix)
-    return [
-        blob
-        for blob in blobs
-        if not _prediction_blob_name(blob).endswith("/")
-        and fnmatch.fnmatch(Path(_prediction_blob_name(blob)).name, output_glob)
-    ]
+    matches = _glob_match(output_glob)
+    selected = []
+    for blob in blobs:
+        name = _prediction_blob_name(blob)
+        if not name.endswith("/") and matches(os.path.normcase(name.rpartition("/")[2])):
+            selected.append(blob)
+    return selected
 
 
 def _iter_blob_lines(blob: object) -> Iterator[str]:
@@ -215,22 +223,13 @@ def collect_valid_outputs_from_jsonl_sources(
 def _flush_collected_rows(
     *,
     rows_to_flush: list[dict],
-    out_path: Path,
-    output_format: str,
-    header_written: bool,
-) -> tuple[bool, int]:
+    writer: DatasetWriter,
+) -> int:
     if not rows_to_flush:
-        return header_written, 0
-    header_written = flush_rows(
-        rows=rows_to_flush,
-        out_path=str(out_path),
-        header_written=header_written,
-        output_format=output_format,
-        sep=config.csv_sep,
-    )
-    count = len(rows_to_flush)
+        return 0
+    count = writer.write_rows(rows_to_flush)
     rows_to_flush.clear()
-    return header_written, count
+    return count
 
 
 def write_collected_dataset(
@@ -244,50 +243,47 @@ def write_collected_dataset(
     rows_to_flush: list[dict] = []
     total_rows = 0
     flush_every = max(1, int(config.flush_every or config.batch_size))
+    writer = DatasetWriter(
+        out_path,
+        output_format,
+        header_written=header_written,
+        sep=config.csv_sep,
+    )
 
-    for key in sorted(collected.selected):
-        image_name = image_name_from_reference(key)
-        if keys is not None and image_name not in keys:
-            continue
-        result = collected.selected[key]
-        if result.parsed_model is None:
-            continue
-        rows = data_to_rows(
-            result.parsed_model,
-            file_name=key,
-            field_confidence_by_pointer=result.metadata.get(
-                "field_confidence_by_pointer"
-            ),
-        )
-        add_response_metadata_columns(rows, result.metadata)
-        rows_to_flush.extend(rows)
-
-        if len(rows_to_flush) >= flush_every:
-            header_written, wrote = _flush_collected_rows(
-                rows_to_flush=rows_to_flush,
-                out_path=out_path,
-                output_format=output_format,
-                header_written=header_written,
+    with writer:
+        for key in sorted(collected.selected):
+            image_name = image_name_from_reference(key)
+            if keys is not None and image_name not in keys:
+                continue
+            result = collected.selected[key]
+            if result.parsed_model is None:
+                continue
+            rows = data_to_rows(
+                result.parsed_model,
+                file_name=key,
+                field_confidence_by_pointer=result.metadata.get(
+                    "field_confidence_by_pointer"
+                ),
             )
-            total_rows += wrote
+            add_response_metadata_columns(rows, result.metadata)
+            rows_to_flush.extend(rows)
 
-    if rows_to_flush:
-        header_written, wrote = _flush_collected_rows(
-            rows_to_flush=rows_to_flush,
-            out_path=out_path,
-            output_format=output_format,
-            header_written=header_written,
+            if len(rows_to_flush) >= flush_every:
+                total_rows += _flush_collected_rows(
+                    rows_to_flush=rows_to_flush, writer=writer
+                )
+
+        total_rows += _flush_collected_rows(
+            rows_to_flush=rows_to_flush, writer=writer
         )
-        total_rows += wrote
-    return header_written, total_rows
+    return writer.header_written, total_rows
 
 
 def _write_jsonl(path: Path, rows: Iterable[dict]) -> int:
     count = 0
-    with open(path, "w", encoding="utf-8") as handle:
+    with open(path, "wb") as handle:
         for row in rows:
-            handle.write(json.dumps(row, ensure_ascii=False, default=str))
-            handle.write("\n")
+            handle.write(_jsonl_line(row))
             count += 1
     return count
 
@@ -444,16 +440,19 @@ def collect_outputs(args: argparse.Namespace | None = None) -> CollectOutputsRes
         if pages_checked
         else existing_dataset_image_names
     )
-    keys_to_append = {
-        key
+    # Each selected key's image name is derived once and reused for the
+    # write filter and the report counts below.
+    image_names_to_append = {
+        image_name
         for key in selected_keys
-        if image_name_from_reference(key) not in existing_covered_image_names
+        if (image_name := image_name_from_reference(key))
+        and image_name not in existing_covered_image_names
     }
     header_written, added_rows = write_collected_dataset(
         collected,
         out_path=out_path,
         output_format=output_format,
-        keys=build_image_name_set(keys_to_append),
+        keys=image_names_to_append,
         header_written=header_written,
     )
     dataset_rows += added_rows
@@ -529,7 +528,7 @@ def collect_outputs(args: argparse.Namespace | None = None) -> CollectOutputsRes
         "existing_dataset_rows": existing_dataset_rows,
         "existing_dataset_image_names": len(existing_dataset_image_names),
         "kept_existing_rows": kept_existing_rows,
-        "new_output_image_names_added": len(build_image_name_set(keys_to_append)),
+        "new_output_image_names_added": len(image_names_to_append),
         "new_output_rows_added": added_rows,
         "final_dataset_image_names": len(final_dataset_image_names),
         "dataset_rows": dataset_rows,
@@ -568,7 +567,7 @@ def collect_outputs(args: argparse.Namespace | None = None) -> CollectOutputsRes
         )
     print(
         f"Collected {len(selected_keys)} unique valid output key(s), "
-        f"added {len(build_image_name_set(keys_to_append))} new image(s), "
+        f"added {len(image_names_to_append)} new image(s), "
         f"into {out_path} ({dataset_rows} dataset row(s))."
     )
     print(f"Coverage report: {report_path}")
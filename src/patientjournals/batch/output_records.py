@@ -7,7 +7,10 @@ from typing import Iterable, Iterator
 from pydantic import BaseModel
 
 from patientjournals.config import config
-from patientjournals.shared.response_parsing import extract_response_metadata
+from patientjournals.shared.response_parsing import (
+    extract_response_metadata,
+    parse_output_json,
+)
 
 
 @dataclass
@@ -110,7 +113,7 @@ def parse_gemini_output_record(
         )
 
     try:
-        parsed_model = config.output_model.model_validate_json(text_payload)
+        parsed_model = parse_output_json(config.output_model, text_payload)
     except Exception as exc:
         return GeminiOutputParseResult(
             key=key,
@@ -14,7 +14,6 @@ from typing import Any
 
 from google import genai
 from google.cloud import storage
-from google.genai import types
 from tqdm import tqdm
 
 from patientjournals.batch.client import get_batch_client, resolve_service_account_path
@@ -30,9 +29,12 @@ from patientjournals.batch.retry import (
 from patientjournals.config import config
 from patientjournals.shared.generation_spec import (
     build_live_generation_config,
+    build_live_request_contents,
+    live_http_options,
 )
 from patientjournals.config.models import resolve_model_spec
 from patientjournals.shared.api_retry import (
+    build_rate_limiter,
     is_retryable_api_error,
     retry_delay_seconds,
 )
@@ -44,10 +46,18 @@ from patientjournals.shared.processing_metrics import (
     utc_now_iso,
     write_processing_summary,
 )
-from patientjournals.shared.response_parsing import extract_response_metadata
+from patientjournals.shared.response_parsing import (
+    extract_response_metadata,
+    parse_output,
+    parse_output_json,
+)
 from patientjournals.shared import run_layout
 from patientjournals.shared.identity import identity_columns
-from patientjournals.shared.tools import create_subfolder, flush_rows, get_run_logger
+from patientjournals.shared.tools import (
+    DatasetWriter,
+    create_subfolder,
+    get_run_logger,
+)
 
 
 _GEMINI_TERMINAL_STATES = {
@@ -254,7 +264,7 @@ def _provider_from_batch_names(
     submit_run_dir: Path | None,
 ) -> str:
     if submit_run_dir is not None:
-        payload = _read_batch_job_payload(submit_run_dir / "batch_job.json")
+        payload = run_layout.read_batch_job_payload(submit_run_dir / "batch_job.json")
         if payload:
             provider = payload.get("provider")
             if isinstance(provider, str) and provider.strip():
@@ -476,27 +486,34 @@ async def _generate_recovery_response(
     aio_client = getattr(recovery_client, "aio", None)
     aio_models = getattr(aio_client, "models", None)
     async_generate = getattr(aio_models, "generate_content", None)
+    contents = build_live_request_contents(image_bytes=image_bytes, mime_type=mime_type)
     if callable(async_generate):
         return await async_generate(
             model=recovery_model,
-            contents=[
-                types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-                config.input_prompt,
-            ],
+            contents=contents,
             config=generation_config,
         )
 
     return await asyncio.to_thread(
         recovery_client.models.generate_content,
         model=recovery_model,
-        contents=[
-            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-            config.input_prompt,
-        ],
+        contents=contents,
         config=generation_config,
     )
 
 
+def _parse_recovery_response(response: object) -> tuple[dict[str, Any], Any]:
+    metadata = extract_response_metadata(response)
+    text_payload = metadata.get("text")
+    if not isinstance(text_payload, str) or not text_payload.strip():
+        raise ValueError("Empty response text from API key recovery.")
+    return metadata, parse_output(
+        config.output_model,
+        text_payload,
+        getattr(response, "parsed", None),
+    )
+
+
 async def _recover_one_missing_page_via_api_key(
     *,
     key: str,
@@ -506,6 +523,7 @@ async def _recover_one_missing_page_via_api_key(
     recovery_model: str,
     generation_config: dict,
     log,
+    limiter=None,
 ) -> _RecoveryResult:
     blob = bucket.blob(key)
     max_attempts = max(1, int(config.api_max_attempts))
@@ -525,6 +543,8 @@ async def _recover_one_missing_page_via_api_key(
 
             image_bytes = await asyncio.to_thread(blob.download_as_bytes)
             mime_type = _guess_blob_mime_type(blob, key)
+            if limiter is not None:
+                await limiter.acquire()
             generation_started = time.perf_counter()
             response = await _generate_recovery_response(
                 recovery_client=recovery_client,
@@ -535,12 +555,12 @@ async def _recover_one_missing_page_via_api_key(
             )
             generation_seconds = time.perf_counter() - generation_started
 
-            metadata = extract_response_metadata(response)
-            text_payload = metadata.get("text")
-            if not isinstance(text_payload, str) or not text_payload.strip():
-                raise ValueError("Empty response text from API key recovery.")
-
-            parsed_model = config.output_model.model_validate_json(text_payload)
+            # Metadata extraction and schema validation are CPU work; keep them
+            # off the event loop so other recoveries' network I/O keeps moving.
+            metadata, parsed_model = await asyncio.to_thread(
+                _parse_recovery_response,
+                response,
+            )
             return _RecoveryResult(
                 key=key,
                 line_number=line_number,
@@ -590,9 +610,35 @@ async def _recover_missing_pages_via_api_key_async(
     recovery_model: str,
     generation_config: dict,
     log,
+    http_client=None,
+) -> list[_RecoveryResult]:
+    try:
+        return await _recover_pages_with_client(
+            missing_keys=missing_keys,
+            bucket=bucket,
+            recovery_client=recovery_client,
+            recovery_model=recovery_model,
+            generation_config=generation_config,
+            log=log,
+        )
+    finally:
+        # Closed on the loop that opened its connections.
+        if http_client is not None:
+            await http_client.aclose()
+
+
+async def _recover_pages_with_client(
+    *,
+    missing_keys: set[str],
+    bucket,
+    recovery_client,
+    recovery_model: str,
+    generation_config: dict,
+    log,
 ) -> list[_RecoveryResult]:
     concurrency = max(1, int(config.api_concurrent_tasks or 1))
     semaphore = asyncio.Semaphore(concurrency)
+    limiter = build_rate_limiter()
     base_line_number = 1_000_000
 
     async def run_one(offset: int, key: str) -> _RecoveryResult:
@@ -605,6 +651,7 @@ async def _recover_missing_pages_via_api_key_async(
                 recovery_model=recovery_model,
                 generation_config=generation_config,
                 log=log,
+                limiter=limiter,
             )
 
     tasks = [
@@ -660,7 +707,11 @@ def _recover_missing_pages_via_api_key(
     bucket = storage_client.bucket(bucket_name)
 
     recovery_model = (config.api_recovery_model or "").strip() or config.model
-    recovery_client = genai.Client(api_key=_resolve_recovery_api_key())
+    http_options = live_http_options()
+    recovery_client = genai.Client(
+        api_key=_resolve_recovery_api_key(),
+        http_options=http_options,
+    )
     generation_config = _build_api_key_generation_config()
     concurrency = max(1, int(config.api_concurrent_tasks or 1))
     max_attempts = max(1, int(config.api_max_attempts))
@@ -679,6 +730,7 @@ def _recover_missing_pages_via_api_key(
             recovery_model=recovery_model,
             generation_config=generation_config,
             log=log,
+            http_client=http_options.httpx_async_client,
         )
     )
 
@@ -769,18 +821,6 @@ def _recover_missing_pages_via_api_key(
     return recovered
 
 
-def _read_batch_job_payload(path: Path) -> dict | None:
-    if not path.exists() or not path.is_file():
-        return None
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return None
-    if isinstance(payload, dict):
-        return payload
-    return None
-
-
 def _read_request_keys_from_file(path: Path) -> set[str]:
     keys: set[str] = set()
     with open(path, "r", encoding="utf-8") as handle:
@@ -880,7 +920,7 @@ def _find_submit_run_dir(batch_names: list[str]) -> Path | None:
     target = {name for name in batch_names if isinstance(name, str) and name.strip()}
     run_dirs = run_layout.iter_run_dirs(config.output_root, "submit")
     for run_dir in run_dirs:
-        job_payload = _read_batch_job_payload(run_dir / "batch_job.json")
+        job_payload = run_layout.read_batch_job_payload(run_dir / "batch_job.json")
         if not job_payload:
             continue
         payload_names = set(_extract_batch_names_from_payload(job_payload))
@@ -912,7 +952,7 @@ def _resolve_expected_request_keys(
         )
         return set()
 
-    payload = _read_batch_job_payload(submit_run_dir / "batch_job.json")
+    payload = run_layout.read_batch_job_payload(submit_run_dir / "batch_job.json")
     if not payload:
         log(
             f"Submit run {submit_run_dir} has no readable batch_job.json; "
@@ -970,7 +1010,7 @@ def _resolve_anthropic_custom_id_to_key(
         )
         return {}
 
-    payload = _read_batch_job_payload(submit_run_dir / "batch_job.json")
+    payload = run_layout.read_batch_job_payload(submit_run_dir / "batch_job.json")
     if not payload:
         log(
             f"Submit run {submit_run_dir} has no readable batch_job.json; "
@@ -1034,7 +1074,7 @@ def _output_destinations_from_submit_run(
 ) -> dict[str, str]:
     if submit_run_dir is None:
         return {}
-    payload = _read_batch_job_payload(submit_run_dir / "batch_job.json")
+    payload = run_layout.read_batch_job_payload(submit_run_dir / "batch_job.json")
     if not payload:
         return {}
 
@@ -1254,12 +1294,17 @@ def _download_from_vertex_gcs_output(
     if not jsonl_blobs:
         raise RuntimeError(f"No JSONL outputs found at {dest_gcs_uri}.")
 
-    with open(output_path, "wb") as handle:
+    # Stream each output object straight into the combined file instead of
+    # holding a full copy of it in memory first.
+    with open(output_path, "w+b") as handle:
         for blob in jsonl_blobs:
-            data = blob.download_as_bytes()
-            handle.write(data)
-            if data and not data.endswith(b"\n"):
-                handle.write(b"\n")
+            start = handle.tell()
+            blob.download_to_file(handle)
+            end = handle.tell()
+            if end > start:
+                handle.seek(end - 1)
+                if handle.read(1) != b"\n":
+                    handle.write(b"\n")
 
     log(
         f"Downloaded {len(jsonl_blobs)} output file(s) from "
@@ -1304,6 +1349,17 @@ def _sdk_obj_to_dict(value: object) -> object:
     return value
 
 
+def _sdk_obj_to_json_line(value: object) -> str:
+    # SDK results are pydantic models; serialize them in one compiled pass
+    # rather than dumping to dicts and re-encoding with json.
+    if hasattr(value, "model_dump_json"):
+        try:
+            return value.model_dump_json() + "\n"
+        except Exception:
+            pass
+    return json.dumps(_sdk_obj_to_dict(value), ensure_ascii=False, default=str) + "\n"
+
+
 def _download_from_anthropic_output(
     client,
     batch_name: str,
@@ -1313,9 +1369,7 @@ def _download_from_anthropic_output(
     count = 0
     with open(output_path, "w", encoding="utf-8") as handle:
         for item in client.messages.batches.results(batch_name):
-            payload = _sdk_obj_to_dict(item)
-            handle.write(json.dumps(payload, ensure_ascii=False, default=str))
-            handle.write("\n")
+            handle.write(_sdk_obj_to_json_line(item))
             count += 1
     if count == 0:
         raise RuntimeError(f"No result rows found for Anthropic batch {batch_name}.")
@@ -1389,20 +1443,12 @@ def _await_completion(
 
 
 def _read_batch_names_from_job_file(path: Path) -> list[str]:
-    payload = _read_batch_job_payload(path)
+    payload = run_layout.read_batch_job_payload(path)
     if not payload:
         return []
     return _extract_batch_names_from_payload(payload)
 
 
-def _latest_batch_job_file(output_root: str) -> Path | None:
-    for run_dir in run_layout.iter_run_dirs(output_root, "submit"):
-        candidate = run_dir / "batch_job.json"
-        if candidate.exists() and candidate.is_file():
-            return candidate
-    return None
-
-
 def _resolve_batch_targets(args: argparse.Namespace) -> tuple[list[str], Path | None]:
     cli_batch_names = _arg_batch_names(args)
     if cli_batch_names:
@@ -1416,7 +1462,7 @@ def _resolve_batch_targets(args: argparse.Namespace) -> tuple[list[str], Path |
             return batch_names, candidate.parent
         raise ValueError(f"No batch job names found in {candidate}.")
 
-    latest_job_file = _latest_batch_job_file(config.output_root)
+    latest_job_file = run_layout.latest_batch_job_file(config.output_root)
     if latest_job_file is not None:
         batch_names = _read_batch_names_from_job_file(latest_job_file)
         if batch_names:
@@ -1454,23 +1500,14 @@ def _extract_location_from_batch_name(batch_name: str) -> str | None:
 def _flush_rows(
     *,
     rows_to_flush: list[dict],
-    out_path: Path,
-    output_dataset_format: str,
-    header_written: bool,
-) -> tuple[bool, int]:
+    writer: DatasetWriter,
+) -> int:
     if not rows_to_flush:
-        return header_written, 0
-
-    header_written = flush_rows(
-        rows=rows_to_flush,
-        out_path=str(out_path),
-        header_written=header_written,
-        output_format=output_dataset_format,
-        sep=config.csv_sep,
-    )
-    count = len(rows_to_flush)
+        return 0
+
+    count = writer.write_rows(rows_to_flush)
     rows_to_flush.clear()
-    return header_written, count
+    return count
 
 
 def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResult:
@@ -1740,117 +1777,38 @@ def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResul
 
     flush_every = max(1, int(config.flush_every or config.batch_size))
     rows_to_flush: list[dict] = []
-    header_written = False
-    total_rows = 0
-    error_rows = 0
-    duplicate_rows_skipped = 0
-    recovered_pages = 0
-    failed_rows_included = 0
-
-    output_keys_seen: set[str] = set()
-    successful_page_keys: set[str] = set()
-    failures: dict[str, str] = {}
-
-    global_line_number = 0
-    for output_index, (batch_name, raw_path) in enumerate(raw_outputs, start=1):
-        with open(raw_path, "r", encoding="utf-8") as handle:
-            for line_number, line in enumerate(
-                tqdm(handle, desc=f"Parsing {batch_name}", unit="line"),
-                start=1,
-            ):
-                global_line_number += 1
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    record = json.loads(line)
-                except json.JSONDecodeError as exc:
-                    log(f"Invalid JSONL line in batch output ({batch_name}).", exc=exc)
-                    error_rows += 1
-                    append_processing_record(
-                        manifest_path,
-                        base_image_record(
-                            image_reference=None,
-                            source="batch_retrieve",
-                            status="failed",
-                            model=config.model,
-                            provider=provider,
-                            attempts=1,
-                            max_attempts=1,
-                            rows_written=0,
-                            failure_reason="invalid_jsonl_line",
-                            error_type=type(exc).__name__,
-                            error_message=str(exc),
-                            extra={
-                                "batch_name": batch_name,
-                                "raw_output_file": raw_path.name,
-                                "line_number": line_number,
-                            },
-                        ),
-                    )
-                    _record_failure(
-                        failures,
-                        key=None,
-                        line_number=global_line_number,
-                        reason="invalid_jsonl_line",
-                    )
-                    continue
-
-                key: str | None = None
-                metadata: dict[str, object] = {}
-                parsed_model = None
-                if provider == "anthropic":
-                    custom_id = (
-                        _normalize_key(record.get("custom_id"))
-                        if isinstance(record, dict)
-                        else None
-                    )
-                    key = (
-                        anthropic_custom_id_to_key.get(custom_id, custom_id)
-                        if custom_id
-                        else None
-                    )
-                    if key:
-                        output_keys_seen.add(key)
-
-                    if not isinstance(record, dict):
-                        error_rows += 1
-                        append_processing_record(
-                            manifest_path,
-                            base_image_record(
-                                image_reference=key,
-                                source="batch_retrieve",
-                                status="failed",
-                                model=config.model,
-                                provider=provider,
-                                attempts=1,
-                                max_attempts=1,
-                                rows_written=0,
-                                failure_reason="invalid_record_type",
-                                extra={
-                                    "batch_name": batch_name,
-                                    "raw_output_file": raw_path.name,
-                                    "line_number": line_number,
-                                },
-                            ),
-                        )
-                        _record_failure(
-                            failures,
-                            key=key,
-                            line_number=global_line_number,
-                            reason="invalid_record_type",
-                        )
+    with DatasetWriter(out_path, output_dataset_format, sep=config.csv_sep) as writer:
+        total_rows = 0
+        error_rows = 0
+        duplicate_rows_skipped = 0
+        recovered_pages = 0
+        failed_rows_included = 0
+
+        output_keys_seen: set[str] = set()
+        successful_page_keys: set[str] = set()
+        failures: dict[str, str] = {}
+
+        global_line_number = 0
+        for output_index, (batch_name, raw_path) in enumerate(raw_outputs, start=1):
+            with open(raw_path, "r", encoding="utf-8") as handle:
+                for line_number, line in enumerate(
+                    tqdm(handle, desc=f"Parsing {batch_name}", unit="line"),
+                    start=1,
+                ):
+                    global_line_number += 1
+                    line = line.strip()
+                    if not line:
                         continue
 
-                    result = record.get("result")
-                    if not isinstance(result, dict):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        log(f"Invalid JSONL line in batch output ({batch_name}).", exc=exc)
                         error_rows += 1
-                        log(f"Missing/invalid result payload for key={key}")
                         append_processing_record(
                             manifest_path,
                             base_image_record(
-                                image_reference=key,
+                                image_reference=None,
                                 source="batch_retrieve",
                                 status="failed",
                                 model=config.model,
@@ -1858,7 +1816,9 @@ def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResul
                                 attempts=1,
                                 max_attempts=1,
                                 rows_written=0,
-                                failure_reason="missing_result",
+                                failure_reason="invalid_jsonl_line",
+                                error_type=type(exc).__name__,
+                                error_message=str(exc),
                                 extra={
                                     "batch_name": batch_name,
                                     "raw_output_file": raw_path.name,
@@ -1868,79 +1828,269 @@ def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResul
                         )
                         _record_failure(
                             failures,
-                            key=key,
+                            key=None,
                             line_number=global_line_number,
-                            reason="missing_result",
+                            reason="invalid_jsonl_line",
                         )
                         continue
-                    result_type = str(result.get("type") or "").strip().lower()
-                    if result_type != "succeeded":
-                        error_rows += 1
-                        log(
-                            f"Anthropic batch non-success for key={key}: type={result_type}"
-                        )
-                        append_processing_record(
-                            manifest_path,
-                            base_image_record(
-                                image_reference=key,
-                                source="batch_retrieve",
-                                status="failed",
-                                model=config.model,
-                                provider=provider,
-                                attempts=1,
-                                max_attempts=1,
-                                rows_written=0,
-                                failure_reason=f"batch_{result_type or 'unknown'}",
-                                extra={
-                                    "batch_name": batch_name,
-                                    "raw_output_file": raw_path.name,
-                                    "line_number": line_number,
-                                },
-                            ),
-                        )
-                        _record_failure(
-                            failures,
-                            key=key,
-                            line_number=global_line_number,
-                            reason=f"batch_{result_type or 'unknown'}",
+
+                    key: str | None = None
+                    metadata: dict[str, object] = {}
+                    parsed_model = None
+                    if provider == "anthropic":
+                        custom_id = (
+                            _normalize_key(record.get("custom_id"))
+                            if isinstance(record, dict)
+                            else None
                         )
-                        continue
-                    response = result.get("message")
-                    if response is None:
-                        error_rows += 1
-                        log(f"Missing message in Anthropic result for key={key}")
-                        append_processing_record(
-                            manifest_path,
-                            base_image_record(
-                                image_reference=key,
-                                source="batch_retrieve",
-                                status="failed",
-                                model=config.model,
-                                provider=provider,
-                                attempts=1,
-                                max_attempts=1,
-                                rows_written=0,
-                                failure_reason="missing_response",
-                                extra={
-                                    "batch_name": batch_name,
-                                    "raw_output_file": raw_path.name,
-                                    "line_number": line_number,
-                                },
-                            ),
+                        key = (
+                            anthropic_custom_id_to_key.get(custom_id, custom_id)
+                            if custom_id
+                            else None
                         )
-                        _record_failure(
-                            failures,
-                            key=key,
-                            line_number=global_line_number,
-                            reason="missing_response",
+                        if key:
+                            output_keys_seen.add(key)
+
+                        if not isinstance(record, dict):
+                            error_rows += 1
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason="invalid_record_type",
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason="invalid_record_type",
+                            )
+                            continue
+
+                        result = record.get("result")
+                        if not isinstance(result, dict):
+                            error_rows += 1
+                            log(f"Missing/invalid result payload for key={key}")
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason="missing_result",
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason="missing_result",
+                            )
+                            continue
+                        result_type = str(result.get("type") or "").strip().lower()
+                        if result_type != "succeeded":
+                            error_rows += 1
+                            log(
+                                f"Anthropic batch non-success for key={key}: type={result_type}"
+                            )
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason=f"batch_{result_type or 'unknown'}",
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason=f"batch_{result_type or 'unknown'}",
+                            )
+                            continue
+                        response = result.get("message")
+                        if response is None:
+                            error_rows += 1
+                            log(f"Missing message in Anthropic result for key={key}")
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason="missing_response",
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason="missing_response",
+                            )
+                            continue
+                        metadata = _extract_anthropic_response_metadata(response)
+
+                        text_payload = metadata.get("text")
+                        if not text_payload:
+                            error_rows += 1
+                            log(f"Empty response text for key={key}")
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason="empty_response_text",
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason="empty_response_text",
+                            )
+                            continue
+
+                        try:
+                            parsed_model = parse_output_json(
+                                config.output_model, text_payload
+                            )
+                        except Exception as exc:
+                            error_rows += 1
+                            log(f"Schema validation failed for key={key}", exc=exc)
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason="schema_validation_failed",
+                                    error_type=type(exc).__name__,
+                                    error_message=str(exc),
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason="schema_validation_failed",
+                            )
+                            continue
+                    else:
+                        parse_result = parse_gemini_output_record(
+                            record,
+                            source=batch_name,
+                            line_number=line_number,
                         )
-                        continue
-                    metadata = _extract_anthropic_response_metadata(response)
+                        key = parse_result.key
+                        if key:
+                            output_keys_seen.add(key)
+                        if not parse_result.is_valid:
+                            reason = parse_result.reason or "unknown"
+                            error_rows += 1
+                            if parse_result.detail:
+                                log(
+                                    f"Gemini output rejected for key={key}: "
+                                    f"{reason} ({parse_result.detail})"
+                                )
+                            else:
+                                log(f"Gemini output rejected for key={key}: {reason}")
+                            _record_failure(
+                                failures,
+                                key=key,
+                                line_number=global_line_number,
+                                reason=reason,
+                            )
+                            append_processing_record(
+                                manifest_path,
+                                base_image_record(
+                                    image_reference=key,
+                                    source="batch_retrieve",
+                                    status="failed",
+                                    model=config.model,
+                                    provider=provider,
+                                    attempts=1,
+                                    max_attempts=1,
+                                    rows_written=0,
+                                    failure_reason=reason,
+                                    error_message=parse_result.detail,
+                                    extra={
+                                        "batch_name": batch_name,
+                                        "raw_output_file": raw_path.name,
+                                        "line_number": line_number,
+                                    },
+                                ),
+                            )
+                            continue
+                        metadata = parse_result.metadata
+                        parsed_model = parse_result.parsed_model
 
-                    text_payload = metadata.get("text")
-                    if not text_payload:
+                    if parsed_model is None:
                         error_rows += 1
-                        log(f"Empty response text for key={key}")
                         append_processing_record(
                             manifest_path,
                             base_image_record(
@@ -1952,7 +2102,7 @@ def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResul
                                 attempts=1,
                                 max_attempts=1,
                                 rows_written=0,
-                                failure_reason="empty_response_text",
+                                failure_reason="missing_parsed_model",
                                 extra={
                                     "batch_name": batch_name,
                                     "raw_output_file": raw_path.name,
@@ -1964,328 +2114,211 @@ def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResul
                             failures,
                             key=key,
                             line_number=global_line_number,
-                            reason="empty_response_text",
+                            reason="missing_parsed_model",
                         )
                         continue
 
-                    try:
-                        parsed_model = config.output_model.model_validate_json(
-                            text_payload
-                        )
-                    except Exception as exc:
-                        error_rows += 1
-                        log(f"Schema validation failed for key={key}", exc=exc)
+                    file_key = key or f"<batch:{output_index}-line:{line_number}>"
+                    if (
+                        key
+                        and duplicate_strategy == "first_successful"
+                        and key in successful_page_keys
+                    ):
+                        duplicate_rows_skipped += 1
                         append_processing_record(
                             manifest_path,
                             base_image_record(
                                 image_reference=key,
                                 source="batch_retrieve",
-                                status="failed",
+                                status="duplicate_skipped",
                                 model=config.model,
                                 provider=provider,
                                 attempts=1,
                                 max_attempts=1,
                                 rows_written=0,
-                                failure_reason="schema_validation_failed",
-                                error_type=type(exc).__name__,
-                                error_message=str(exc),
                                 extra={
                                     "batch_name": batch_name,
                                     "raw_output_file": raw_path.name,
                                     "line_number": line_number,
+                                    "duplicate_strategy": duplicate_strategy,
+                                    "duplicate_action": "kept_first_successful",
                                 },
                             ),
                         )
-                        _record_failure(
-                            failures,
-                            key=key,
-                            line_number=global_line_number,
-                            reason="schema_validation_failed",
-                        )
                         continue
-                else:
-                    parse_result = parse_gemini_output_record(
-                        record,
-                        source=batch_name,
-                        line_number=line_number,
-                    )
-                    key = parse_result.key
                     if key:
-                        output_keys_seen.add(key)
-                    if not parse_result.is_valid:
-                        reason = parse_result.reason or "unknown"
-                        error_rows += 1
-                        if parse_result.detail:
-                            log(
-                                f"Gemini output rejected for key={key}: "
-                                f"{reason} ({parse_result.detail})"
-                            )
-                        else:
-                            log(f"Gemini output rejected for key={key}: {reason}")
-                        _record_failure(
-                            failures,
-                            key=key,
-                            line_number=global_line_number,
-                            reason=reason,
-                        )
-                        append_processing_record(
-                            manifest_path,
-                            base_image_record(
-                                image_reference=key,
-                                source="batch_retrieve",
-                                status="failed",
-                                model=config.model,
-                                provider=provider,
-                                attempts=1,
-                                max_attempts=1,
-                                rows_written=0,
-                                failure_reason=reason,
-                                error_message=parse_result.detail,
-                                extra={
-                                    "batch_name": batch_name,
-                                    "raw_output_file": raw_path.name,
-                                    "line_number": line_number,
-                                },
-                            ),
-                        )
-                        continue
-                    metadata = parse_result.metadata
-                    parsed_model = parse_result.parsed_model
+                        successful_page_keys.add(key)
 
-                if parsed_model is None:
-                    error_rows += 1
-                    append_processing_record(
-                        manifest_path,
-                        base_image_record(
-                            image_reference=key,
-                            source="batch_retrieve",
-                            status="failed",
-                            model=config.model,
-                            provider=provider,
-                            attempts=1,
-                            max_attempts=1,
-                            rows_written=0,
-                            failure_reason="missing_parsed_model",
-                            extra={
-                                "batch_name": batch_name,
-                                "raw_output_file": raw_path.name,
-                                "line_number": line_number,
-                            },
+                    rows = data_to_rows(
+                        parsed_model,
+                        file_name=file_key,
+                        field_confidence_by_pointer=metadata.get(
+                            "field_confidence_by_pointer"
                         ),
                     )
-                    _record_failure(
-                        failures,
-                        key=key,
-                        line_number=global_line_number,
-                        reason="missing_parsed_model",
-                    )
-                    continue
-
-                file_key = key or f"<batch:{output_index}-line:{line_number}>"
-                if (
-                    key
-                    and duplicate_strategy == "first_successful"
-                    and key in successful_page_keys
-                ):
-                    duplicate_rows_skipped += 1
+                    _mark_success_rows(rows)
+                    add_response_metadata_columns(rows, metadata)
+                    rows_to_flush.extend(rows)
                     append_processing_record(
                         manifest_path,
                         base_image_record(
-                            image_reference=key,
+                            image_reference=file_key,
                             source="batch_retrieve",
-                            status="duplicate_skipped",
+                            status="success",
                             model=config.model,
                             provider=provider,
                             attempts=1,
                             max_attempts=1,
-                            rows_written=0,
+                            rows_written=len(rows),
                             extra={
                                 "batch_name": batch_name,
                                 "raw_output_file": raw_path.name,
                                 "line_number": line_number,
                                 "duplicate_strategy": duplicate_strategy,
-                                "duplicate_action": "kept_first_successful",
+                                "duplicate_action": "provided"
+                                if duplicate_strategy == "provide_all"
+                                else "kept",
                             },
                         ),
                     )
-                    continue
-                if key:
-                    successful_page_keys.add(key)
-
-                rows = data_to_rows(
-                    parsed_model,
-                    file_name=file_key,
-                    field_confidence_by_pointer=metadata.get(
-                        "field_confidence_by_pointer"
-                    ),
+
+                    if len(rows_to_flush) >= flush_every:
+                        total_rows += _flush_rows(
+                            rows_to_flush=rows_to_flush,
+                            writer=writer,
+                        )
+
+        expected_batch_names = (
+            batch_names
+            if recover_missing_with_api
+            else [name for name, _ in raw_outputs]
+        )
+        expected_keys = _resolve_expected_request_keys(
+            submit_run_dir=submit_run_dir,
+            batch_names=batch_names,
+            selected_batch_names=expected_batch_names,
+            log=log,
+        )
+        expected_success = _expected_success_keys(
+            expected_keys=expected_keys,
+            observed_output_keys=output_keys_seen,
+        )
+        missing_success_keys = expected_success - successful_page_keys
+        if missing_success_keys and provider == "gemini":
+            recovery_keys: set[str] = set()
+            recovery_force = False
+
+            if recover_missing_with_api:
+                recovery_keys = missing_success_keys
+                recovery_force = True
+                log(
+                    "Recover-missing API mode enabled: attempting live API recovery "
+                    f"for {len(recovery_keys)} missing expected page(s)."
+                )
+            elif config.api_recovery_enabled:
+                recovery_keys = missing_success_keys
+
+            if recovery_keys:
+                recovered_count = _recover_missing_pages_via_api_key(
+                    missing_keys=recovery_keys,
+                    successful_keys=successful_page_keys,
+                    observed_output_keys=output_keys_seen,
+                    failures=failures,
+                    rows_to_flush=rows_to_flush,
+                    log=log,
+                    force=recovery_force,
+                    manifest_path=manifest_path,
+                )
+                recovered_pages += recovered_count
+                if recovered_count:
+                    remaining = (
+                        _expected_success_keys(
+                            expected_keys=expected_keys,
+                            observed_output_keys=output_keys_seen,
+                        )
+                        - successful_page_keys
+                    )
+                    log(f"API key recovery remaining unsuccessful pages: {len(remaining)}.")
+        elif missing_success_keys and config.api_recovery_enabled:
+            log(
+                f"Skipping api_recovery_enabled for provider '{provider}': "
+                "API key recovery is currently implemented for Gemini only."
+            )
+
+        final_expected_success = _expected_success_keys(
+            expected_keys=expected_keys,
+            observed_output_keys=output_keys_seen,
+        )
+        failed_retry_keys, failed_retry_reasons = _collect_failed_retry_keys(
+            expected_success_keys=final_expected_success,
+            successful_page_keys=successful_page_keys,
+            failures=failures,
+        )
+        ignore_failed = bool(getattr(args, "ignore_failed", False))
+        if submit_failed_requested:
+            if incomplete_batches:
+                log(
+                    "Skipping failed-page retry submission because retrieval is partial "
+                    "and not all chunk jobs are complete."
                 )
-                _mark_success_rows(rows)
-                add_response_metadata_columns(rows, metadata)
-                rows_to_flush.extend(rows)
+                print(
+                    "Skipped failed-page retry submission: retrieval used partial chunks."
+                )
+            elif failed_retry_keys:
+                retry_submission = _submit_failed_pages_as_batch(
+                    failed_keys=failed_retry_keys,
+                    failure_reasons=failed_retry_reasons,
+                    provider=provider,
+                    client=client,
+                    batch_names=batch_names,
+                    submit_run_dir=submit_run_dir,
+                    log=log,
+                    num_batches=failed_retry_num_batches,
+                )
+                if retry_submission is not None:
+                    retry_run_dir, retry_batch_names, retry_count = retry_submission
+                    batch_label = "batch" if len(retry_batch_names) == 1 else "batches"
+                    print(
+                        f"Submitted failed-page retry {batch_label} "
+                        f"({retry_count} key(s), {len(retry_batch_names)} chunk(s)): "
+                        f"{', '.join(retry_batch_names)} [{retry_run_dir}]"
+                    )
+            else:
+                log(
+                    "Failed-page retry submission requested, but no failed keys were detected."
+                )
+                print("No failed keys detected; retry batch was not submitted.")
+
+        if ignore_failed and failed_retry_keys:
+            failed_rows = [
+                _failed_dataset_row(key, failed_retry_reasons.get(key, "failed"))
+                for key in sorted(failed_retry_keys)
+            ]
+            rows_to_flush.extend(failed_rows)
+            failed_rows_included = len(failed_rows)
+            for row in failed_rows:
                 append_processing_record(
                     manifest_path,
                     base_image_record(
-                        image_reference=file_key,
+                        image_reference=str(row.get("file_name") or ""),
                         source="batch_retrieve",
-                        status="success",
+                        status="failed_included",
                         model=config.model,
                         provider=provider,
                         attempts=1,
                         max_attempts=1,
-                        rows_written=len(rows),
+                        rows_written=1,
+                        failure_reason=str(row.get("failure_reason") or "failed"),
                         extra={
-                            "batch_name": batch_name,
-                            "raw_output_file": raw_path.name,
-                            "line_number": line_number,
-                            "duplicate_strategy": duplicate_strategy,
-                            "duplicate_action": "provided"
-                            if duplicate_strategy == "provide_all"
-                            else "kept",
+                            "ignore_failed": True,
                         },
                     ),
                 )
-
-                if len(rows_to_flush) >= flush_every:
-                    header_written, wrote = _flush_rows(
-                        rows_to_flush=rows_to_flush,
-                        out_path=out_path,
-                        output_dataset_format=output_dataset_format,
-                        header_written=header_written,
-                    )
-                    total_rows += wrote
-
-    expected_batch_names = (
-        batch_names
-        if recover_missing_with_api
-        else [name for name, _ in raw_outputs]
-    )
-    expected_keys = _resolve_expected_request_keys(
-        submit_run_dir=submit_run_dir,
-        batch_names=batch_names,
-        selected_batch_names=expected_batch_names,
-        log=log,
-    )
-    expected_success = _expected_success_keys(
-        expected_keys=expected_keys,
-        observed_output_keys=output_keys_seen,
-    )
-    missing_success_keys = expected_success - successful_page_keys
-    if missing_success_keys and provider == "gemini":
-        recovery_keys: set[str] = set()
-        recovery_force = False
-
-        if recover_missing_with_api:
-            recovery_keys = missing_success_keys
-            recovery_force = True
             log(
-                "Recover-missing API mode enabled: attempting live API recovery "
-                f"for {len(recovery_keys)} missing expected page(s)."
+                "Ignore-failed enabled: included "
+                f"{failed_rows_included} failed page placeholder row(s) in the dataset."
             )
-        elif config.api_recovery_enabled:
-            recovery_keys = missing_success_keys
-
-        if recovery_keys:
-            recovered_count = _recover_missing_pages_via_api_key(
-                missing_keys=recovery_keys,
-                successful_keys=successful_page_keys,
-                observed_output_keys=output_keys_seen,
-                failures=failures,
-                rows_to_flush=rows_to_flush,
-                log=log,
-                force=recovery_force,
-                manifest_path=manifest_path,
-            )
-            recovered_pages += recovered_count
-            if recovered_count:
-                remaining = (
-                    _expected_success_keys(
-                        expected_keys=expected_keys,
-                        observed_output_keys=output_keys_seen,
-                    )
-                    - successful_page_keys
-                )
-                log(f"API key recovery remaining unsuccessful pages: {len(remaining)}.")
-    elif missing_success_keys and config.api_recovery_enabled:
-        log(
-            f"Skipping api_recovery_enabled for provider '{provider}': "
-            "API key recovery is currently implemented for Gemini only."
-        )
-
-    final_expected_success = _expected_success_keys(
-        expected_keys=expected_keys,
-        observed_output_keys=output_keys_seen,
-    )
-    failed_retry_keys, failed_retry_reasons = _collect_failed_retry_keys(
-        expected_success_keys=final_expected_success,
-        successful_page_keys=successful_page_keys,
-        failures=failures,
-    )
-    ignore_failed = bool(getattr(args, "ignore_failed", False))
-    if submit_failed_requested:
-        if incomplete_batches:
-            log(
-                "Skipping failed-page retry submission because retrieval is partial "
-                "and not all chunk jobs are complete."
-            )
-            print(
-                "Skipped failed-page retry submission: retrieval used partial chunks."
-            )
-        elif failed_retry_keys:
-            retry_submission = _submit_failed_pages_as_batch(
-                failed_keys=failed_retry_keys,
-                failure_reasons=failed_retry_reasons,
-                provider=provider,
-                client=client,
-                batch_names=batch_names,
-                submit_run_dir=submit_run_dir,
-                log=log,
-                num_batches=failed_retry_num_batches,
-            )
-            if retry_submission is not None:
-                retry_run_dir, retry_batch_names, retry_count = retry_submission
-                batch_label = "batch" if len(retry_batch_names) == 1 else "batches"
-                print(
-                    f"Submitted failed-page retry {batch_label} "
-                    f"({retry_count} key(s), {len(retry_batch_names)} chunk(s)): "
-                    f"{', '.join(retry_batch_names)} [{retry_run_dir}]"
-                )
-        else:
-            log(
-                "Failed-page retry submission requested, but no failed keys were detected."
-            )
-            print("No failed keys detected; retry batch was not submitted.")
 
-    if ignore_failed and failed_retry_keys:
-        failed_rows = [
-            _failed_dataset_row(key, failed_retry_reasons.get(key, "failed"))
-            for key in sorted(failed_retry_keys)
-        ]
-        rows_to_flush.extend(failed_rows)
-        failed_rows_included = len(failed_rows)
-        for row in failed_rows:
-            append_processing_record(
-                manifest_path,
-                base_image_record(
-                    image_reference=str(row.get("file_name") or ""),
-                    source="batch_retrieve",
-                    status="failed_included",
-                    model=config.model,
-                    provider=provider,
-                    attempts=1,
-                    max_attempts=1,
-                    rows_written=1,
-                    failure_reason=str(row.get("failure_reason") or "failed"),
-                    extra={
-                        "ignore_failed": True,
-                    },
-                ),
-            )
-        log(
-            "Ignore-failed enabled: included "
-            f"{failed_rows_included} failed page placeholder row(s) in the dataset."
-        )
-
-    try:
         if bool(getattr(args, "allow_partial", False)):
             log(
                 "Partial retrieval enabled: expected-page and successful-page "
@@ -2308,24 +2341,15 @@ def retrieve_batch(args: argparse.Namespace | None = None) -> RetrieveBatchResul
             ),
             log=log,
         )
-    except RuntimeError:
-        raise
-
-    _print_validation_summary(
-        expected_keys=expected_keys,
-        observed_output_keys=output_keys_seen,
-        successful_keys=successful_page_keys,
-        log=log,
-    )
 
-    if rows_to_flush:
-        header_written, wrote = _flush_rows(
-            rows_to_flush=rows_to_flush,
-            out_path=out_path,
-            output_dataset_format=output_dataset_format,
-            header_written=header_written,
+        _print_validation_summary(
+            expected_keys=expected_keys,
+            observed_output_keys=output_keys_seen,
+            successful_keys=successful_page_keys,
+            log=log,
         )
-        total_rows += wrote
+
+        total_rows += _flush_rows(rows_to_flush=rows_to_flush, writer=writer)
 
     if out_path != final_out_path and out_path.exists():
         out_path.replace(final_out_path)
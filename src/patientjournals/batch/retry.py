@@ -17,6 +17,7 @@ from patientjournals.shared.generation_spec import (
     build_batch_generation_config,
     prompt_text,
 )
+from patientjournals.shared import run_layout
 from patientjournals.shared.tools import create_subfolder, get_run_logger
 
 
@@ -65,18 +66,6 @@ def _require_service_account_file() -> str:
     return service_account_file
 
 
-def _read_batch_job_payload(path: Path) -> dict | None:
-    if not path.exists() or not path.is_file():
-        return None
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return None
-    if isinstance(payload, dict):
-        return payload
-    return None
-
-
 def _extract_location_from_batch_name(batch_name: str) -> str | None:
     parts = [part for part in batch_name.split("/") if part]
     for index, part in enumerate(parts):
@@ -186,6 +175,7 @@ def _build_retry_gemini_request_line(
     *,
     bucket_name: str,
     for_vertex: bool,
+    generation_config: dict | None = None,
 ) -> dict[str, object]:
     media_part = {
         "fileData": {
@@ -207,8 +197,10 @@ def _build_retry_gemini_request_line(
                     "parts": parts,
                 }
             ],
-            "generationConfig": _build_retry_batch_generation_config(
-                for_vertex=for_vertex
+            "generationConfig": (
+                generation_config
+                if generation_config is not None
+                else _build_retry_batch_generation_config(for_vertex=for_vertex)
             ),
         },
     }
@@ -230,6 +222,11 @@ def _write_retry_requests_file(
     bucket_name: str,
     for_vertex: bool,
 ) -> None:
+    generation_config = (
+        None
+        if provider == "anthropic"
+        else _build_retry_batch_generation_config(for_vertex=for_vertex)
+    )
     with open(output_path, "w", encoding="utf-8") as handle:
         for key in keys:
             if provider == "anthropic":
@@ -239,9 +236,9 @@ def _write_retry_requests_file(
                     key,
                     bucket_name=bucket_name,
                     for_vertex=for_vertex,
+                    generation_config=generation_config,
                 )
-            handle.write(json.dumps(payload, ensure_ascii=False))
-            handle.write("\n")
+            handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
 
 
 def _iter_anthropic_manifest_entries(path: Path) -> list[dict[str, str]]:
@@ -467,13 +464,14 @@ def _write_retry_keys_file(
     reasons_by_key: dict[str, str],
 ) -> None:
     with open(path, "w", encoding="utf-8") as handle:
-        for key in keys:
-            payload = {
-                "key": key,
-                "reason": reasons_by_key.get(key, "unknown_failure"),
-            }
-            handle.write(json.dumps(payload, ensure_ascii=False))
-            handle.write("\n")
+        handle.writelines(
+            json.dumps(
+                {"key": key, "reason": reasons_by_key.get(key, "unknown_failure")},
+                ensure_ascii=False,
+            )
+            + "\n"
+            for key in keys
+        )
 
 
 def _write_retry_batch_job_meta(
@@ -555,7 +553,7 @@ def _append_retry_to_source_metadata(
     if submit_run_dir is None:
         return
     source_path = submit_run_dir / "batch_job.json"
-    source_payload = _read_batch_job_payload(source_path)
+    source_payload = run_layout.read_batch_job_payload(source_path)
     if not source_payload:
         return
 
@@ -717,7 +715,7 @@ def _submit_failed_pages_as_batch(
     model_name = str(config.model).strip()
     source_payload: dict = {}
     if submit_run_dir is not None:
-        source_payload = _read_batch_job_payload(submit_run_dir / "batch_job.json")
+        source_payload = run_layout.read_batch_job_payload(submit_run_dir / "batch_job.json")
         source_model = _normalize_key((source_payload or {}).get("model"))
         if source_model:
             model_name = source_model
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import argparse
-import json
 import time
 from dataclasses import dataclass
 from datetime import datetime
@@ -96,20 +95,8 @@ def _extract_batch_names_from_payload(payload: dict) -> list[str]:
     return ordered
 
 
-def _read_batch_job_payload(path: Path) -> dict | None:
-    if not path.exists() or not path.is_file():
-        return None
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return None
-    if isinstance(payload, dict):
-        return payload
-    return None
-
-
 def _read_batch_names_from_job_file(path: Path) -> list[str]:
-    payload = _read_batch_job_payload(path)
+    payload = run_layout.read_batch_job_payload(path)
     if not payload:
         return []
     return _extract_batch_names_from_payload(payload)
@@ -136,14 +123,6 @@ def _request_count_from_payload(payload: dict | None) -> int | None:
     return total if found else None
 
 
-def _latest_batch_job_file(output_root: str) -> Path | None:
-    for run_dir in run_layout.iter_run_dirs(output_root, "submit"):
-        candidate = run_dir / "batch_job.json"
-        if candidate.exists() and candidate.is_file():
-            return candidate
-    return None
-
-
 def _resolve_batch_names(args: argparse.Namespace) -> tuple[list[str], Path | None]:
     if args.batch_name:
         run_dir = Path(args.run_dir).expanduser() if args.run_dir else None
@@ -157,7 +136,7 @@ def _resolve_batch_names(args: argparse.Namespace) -> tuple[list[str], Path | No
             return batch_names, run_dir
         raise ValueError(f"No batch job names found in {candidate}.")
 
-    latest_job_file = _latest_batch_job_file(config.output_root)
+    latest_job_file = run_layout.latest_batch_job_file(config.output_root)
     if latest_job_file is not None:
         batch_names = _read_batch_names_from_job_file(latest_job_file)
         if batch_names:
@@ -259,7 +238,7 @@ def _normalize_gcs_prefix(prefix: str) -> str:
 def _output_destinations_from_submit_run(run_dir: Path | None) -> dict[str, str]:
     if run_dir is None:
         return {}
-    payload = _read_batch_job_payload(run_dir / "batch_job.json")
+    payload = run_layout.read_batch_job_payload(run_dir / "batch_job.json")
     if not payload:
         return {}
     jobs = payload.get("batch_jobs")
@@ -454,7 +433,7 @@ def _provider_from_batch_names(
     run_dir: Path | None,
 ) -> str:
     if run_dir is not None:
-        payload = _read_batch_job_payload(run_dir / "batch_job.json")
+        payload = run_layout.read_batch_job_payload(run_dir / "batch_job.json")
         if payload:
             provider = payload.get("provider")
             if isinstance(provider, str) and provider.strip():
@@ -535,7 +514,7 @@ def main() -> None:
     provider = _provider_from_batch_names(batch_names, run_dir=run_dir)
     client = _get_client(provider, batch_names)
     terminal_states = _terminal_states(provider)
-    submit_payload = _read_batch_job_payload(run_dir / "batch_job.json") if run_dir else None
+    submit_payload = run_layout.read_batch_job_payload(run_dir / "batch_job.json") if run_dir else None
     request_count = _request_count_from_payload(submit_payload)
 
     if args.cancel:
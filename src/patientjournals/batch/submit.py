@@ -320,8 +320,7 @@ def _submitted_batch_ids_by_chunk_from_run_log(
 
 
 def _latest_submit_run_dir(output_root: str) -> Path | None:
-    run_dirs = run_layout.iter_run_dirs(output_root, "submit")
-    return run_dirs[0] if run_dirs else None
+    return run_layout.latest_run_dir(output_root, "submit")
 
 
 def _resolve_rerun_run_dir(args: argparse.Namespace) -> Path:
@@ -15,6 +15,7 @@ from patientjournals.shared.processing_metrics import (
     append_processing_record,
     base_image_record,
 )
+from patientjournals.shared.tools import _scan_pdf_paths
 
 
 _ALLOWED_FP_MODES = {"all", "only_fp", "exclude_fp"}
@@ -263,9 +264,10 @@ def _write_input_duplicate_report(
 
     jsonl_path = root / INPUT_DUPLICATES_JSONL_NAME
     with open(jsonl_path, "w", encoding="utf-8") as handle:
-        for record in records:
-            handle.write(json.dumps(record, ensure_ascii=False, default=str))
-            handle.write("\n")
+        handle.writelines(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            for record in records
+        )
 
     csv_path = root / INPUT_DUPLICATES_CSV_NAME
     fieldnames = [
@@ -641,10 +643,7 @@ def _list_local_pdf_paths(target_folder: str | None) -> list[Path]:
     recursive = bool(config.recursive)
     fp_mode = str(config.fp_mode or "all")
     fp_suffix = str(config.fp_suffix or "_fp")
-    candidates = folder.rglob("*") if recursive else folder.glob("*")
-    pdfs = sorted(
-        path for path in candidates if path.is_file() and path.suffix.lower() == ".pdf"
-    )
+    pdfs = _scan_pdf_paths(folder, recursive)
     selected = _apply_fp_mode_to_pdf_paths(
         pdfs,
         root=folder,
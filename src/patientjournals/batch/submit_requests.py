@@ -123,6 +123,7 @@ def _build_request_line(
     bucket_name: str,
     *,
     for_vertex: bool,
+    generation_config: dict | None = None,
 ) -> dict:
     mime_type = _guess_mime_type(blob)
     media_part = {
@@ -146,7 +147,11 @@ def _build_request_line(
                     "parts": parts,
                 }
             ],
-            "generationConfig": _build_request_config(for_vertex=for_vertex),
+            "generationConfig": (
+                generation_config
+                if generation_config is not None
+                else _build_request_config(for_vertex=for_vertex)
+            ),
         },
     }
 
@@ -346,8 +351,12 @@ def _write_requests_file(
     max_bytes = int(config.batch_input_max_bytes or 0)
     total_bytes = 0
     count = 0
+    # The schema payload (ref-inlined for Vertex) is identical for every line.
+    generation_config = (
+        None if provider == "anthropic" else _build_request_config(for_vertex=for_vertex)
+    )
 
-    with open(output_path, "w", encoding="utf-8") as handle:
+    with open(output_path, "wb", buffering=1 << 20) as handle:
         for blob in tqdm(blobs, desc="Building batch JSONL", unit="img"):
             if provider == "anthropic":
                 line_obj = _build_anthropic_manifest_line(blob)
@@ -356,13 +365,13 @@ def _write_requests_file(
                     blob,
                     bucket_name,
                     for_vertex=for_vertex,
+                    generation_config=generation_config,
                 )
-            line = json.dumps(line_obj, ensure_ascii=False)
+            line = json.dumps(line_obj, ensure_ascii=False).encode("utf-8") + b"\n"
             handle.write(line)
-            handle.write("\n")
             count += 1
 
-            total_bytes += len(line.encode("utf-8")) + 1
+            total_bytes += len(line)
             if max_bytes and total_bytes > max_bytes:
                 raise ValueError(
                     "Batch request file exceeded batch_input_max_bytes. "
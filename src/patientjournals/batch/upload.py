@@ -1,7 +1,11 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
 from pathlib import Path
+import multiprocessing
+import os
 import re
 import time
 
@@ -12,12 +16,13 @@ from tqdm import tqdm
 
 from patientjournals.config import config
 from patientjournals.shared.preprocess import (
-    resize_image,
-    crop_margins,
+    draft_for_max_dim,
     enhance_contrast,
     image_to_bytes,
+    preprocess_settings,
+    resize_and_crop,
 )
-from patientjournals.shared.tools import list_input_files
+from patientjournals.shared.tools import _scan_pdf_paths, list_input_files
 from patientjournals.batch.upload_tuning import UploadAutoTuner, build_upload_tuner
 
 
@@ -26,22 +31,120 @@ _ALLOWED_FP_MODES = {"all", "only_fp", "exclude_fp"}
 _ALLOWED_UPLOAD_SOURCES = {"pdf", "images", "auto"}
 
 
-def _apply_image_settings(img):
-    settings = config.image_settings or {}
-    max_dim = settings.get("max_dim", 3000)
-    margins = tuple(settings.get("margins", (0, 0, 0, 0)))
-    contrast_factor = settings.get("contrast_factor", 1.0)
-    output_format = settings.get("output_format", "PNG")
+def _apply_image_settings(img, settings: dict | None = None):
+    if settings is None:
+        settings = preprocess_settings(config.image_settings)
+    max_dim = settings["max_dim"]
+    margins = settings["margins"]
+    contrast_factor = settings["contrast_factor"]
+    output_format = settings["output_format"]
 
-    img = resize_image(img, max_dim=max_dim)
-    left, top, right, bottom = margins
-    img = crop_margins(img, left=left, top=top, right=right, bottom=bottom)
+    img, _ = resize_and_crop(img, max_dim=max_dim, margins=margins)
     img = enhance_contrast(img, factor=contrast_factor)
-    image_bytes, mime_type = image_to_bytes(img, format_hint=output_format)
+    image_bytes, mime_type = image_to_bytes(
+        img,
+        format_hint=output_format,
+        quality=settings["quality"],
+    )
 
     return image_bytes, mime_type, output_format
 
 
+def _preprocess_upload_image(local_path: str, settings: dict) -> tuple[bytes, str]:
+    with Image.open(local_path) as img:
+        draft_for_max_dim(img, max_dim=settings["max_dim"])
+        image_bytes, mime_type, _ = _apply_image_settings(img, settings)
+    return image_bytes, mime_type
+
+
+# Below this many images per batch, spawning workers costs more than the
+# preprocessing itself.
+_POOL_MIN_IMAGES = 8
+
+
+class _UploadPreprocessPool:
+    """Spawn pool for one upload, started on first use and replaced when a
+    worker dies."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def discard(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False)
+
+    def __enter__(self) -> "_UploadPreprocessPool":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def _upload_preprocess_pool():
+    workers = int(config.upload_preprocess_workers or 0)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return nullcontext(None)
+    return _UploadPreprocessPool(workers)
+
+
+def _iter_preprocessed_images(items, settings: dict, pool):
+    """Yield (local_path, blob_path, result, error) as images finish preprocessing."""
+    if pool is None or len(items) < _POOL_MIN_IMAGES:
+        for local_path, blob_path in items:
+            try:
+                result = _preprocess_upload_image(str(local_path), settings)
+            except (UnidentifiedImageError, OSError) as exc:
+                yield local_path, blob_path, None, exc
+            else:
+                yield local_path, blob_path, result, None
+        return
+
+    remaining = list(items)
+    for _attempt in range(2):
+        executor = pool.executor()
+        pending = {}
+        broken = []
+        for local_path, blob_path in remaining:
+            try:
+                future = executor.submit(_preprocess_upload_image, str(local_path), settings)
+            except BrokenProcessPool as exc:
+                broken.append((local_path, blob_path, exc))
+            else:
+                pending[future] = (local_path, blob_path)
+        for future in as_completed(pending):
+            local_path, blob_path = pending[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool as exc:
+                broken.append((local_path, blob_path, exc))
+            except (UnidentifiedImageError, OSError) as exc:
+                yield local_path, blob_path, None, exc
+            else:
+                yield local_path, blob_path, result, None
+        if not broken:
+            return
+        # A worker died (e.g. killed for memory on a huge scan) and the pool
+        # failed everything still queued; retry those once in a new pool.
+        pool.discard(executor)
+        remaining = [(local_path, blob_path) for local_path, blob_path, _ in broken]
+    for local_path, blob_path, exc in broken:
+        yield local_path, blob_path, None, exc
+
+
 def _extension_for_format(output_format: str) -> str:
     fmt = output_format.strip().lower()
     if fmt in {"jpeg", "jpg"}:
@@ -73,7 +176,7 @@ def _allowed_page_extensions() -> set[str]:
 
 
 def _extract_page_number_from_blob_name(blob_name: str) -> tuple[int, str] | None:
-    base_name = Path(blob_name).name
+    base_name = blob_name.rpartition("/")[2]
     match = _PAGE_NAME_PATTERN.match(base_name)
     if not match:
         return None
@@ -215,11 +318,7 @@ def _list_target_pdfs(target_folder: str | None) -> list[Path]:
     fp_mode = str(config.fp_mode or "all")
     fp_suffix = str(config.fp_suffix or "_fp")
 
-    candidates = folder.rglob("*") if recursive else folder.glob("*")
-    pdfs = sorted(
-        p for p in candidates
-        if p.is_file() and p.suffix.lower() == ".pdf"
-    )
+    pdfs = _scan_pdf_paths(folder, recursive)
     pdfs = _apply_fp_mode_filter(
         pdfs,
         root=folder,
@@ -342,8 +441,8 @@ def _upload_single_pdf(
 
         pages_prefix = _normalize_prefix(config.gcs_pages_prefix or "")
         folder_name = pdf_path.name
-        output_format = (config.image_settings or {}).get("output_format", "PNG")
-        extension = _extension_for_format(str(output_format))
+        image_settings = preprocess_settings(config.image_settings)
+        extension = _extension_for_format(str(image_settings["output_format"]))
         with tqdm(
             total=total_pages,
             desc=f"Uploading {pdf_path.name}",
@@ -360,81 +459,60 @@ def _upload_single_pdf(
                     f"batch {batch_index} w={_effective_workers(tuner)}"
                 )
                 batch_started_at = time.perf_counter()
-                pending_uploads: list[tuple[str, bytes, str, int]] = []
-                for index in range(start, end):
-                    page_number = index + 1
-                    if page_number in uploaded_pages:
-                        progress.update(1)
-                        continue
-
-                    page = doc.get_page(index)
-                    img = None
-                    try:
-                        bitmap = page.render(scale=scale)
-                        try:
-                            img = bitmap.to_pil()
-                        finally:
-                            bitmap.close()
-
-                        image_bytes, mime_type, _ = _apply_image_settings(img)
-                        blob_path = (
-                            f"{pages_prefix}{folder_name}/"
-                            f"page_{page_number:0{digits}d}.{extension}"
-                        )
-                        pending_uploads.append(
-                            (blob_path, image_bytes, mime_type, page_number)
-                        )
-                    finally:
-                        if img is not None:
-                            img.close()
-                        page.close()
-
-                start = end
-                if not pending_uploads:
-                    continue
-
                 upload_workers = _effective_workers(tuner)
                 failed_uploads = 0
-                if upload_workers == 1 or len(pending_uploads) == 1:
-                    for blob_path, image_bytes, mime_type, page_number in pending_uploads:
-                        ok = _upload_blob_bytes(
-                            bucket=bucket,
-                            blob_path=blob_path,
-                            image_bytes=image_bytes,
-                            mime_type=mime_type,
-                        )
-                        if ok:
-                            uploaded_pages.add(page_number)
-                        else:
-                            failed_uploads += 1
-                        progress.update(1)
-                else:
-                    with ThreadPoolExecutor(
-                        max_workers=min(upload_workers, len(pending_uploads))
-                    ) as executor:
-                        futures = {
-                            executor.submit(
+                # Uploads start as soon as each page is rendered, so rendering the
+                # next page overlaps with network I/O for the previous ones.
+                with ThreadPoolExecutor(max_workers=upload_workers) as executor:
+                    futures = {}
+                    for index in range(start, end):
+                        page_number = index + 1
+                        if page_number in uploaded_pages:
+                            progress.update(1)
+                            continue
+
+                        page = doc.get_page(index)
+                        img = None
+                        try:
+                            bitmap = page.render(scale=scale)
+                            try:
+                                img = bitmap.to_pil()
+                            finally:
+                                bitmap.close()
+
+                            image_bytes, mime_type, _ = _apply_image_settings(
+                                img,
+                                image_settings,
+                            )
+                            blob_path = (
+                                f"{pages_prefix}{folder_name}/"
+                                f"page_{page_number:0{digits}d}.{extension}"
+                            )
+                            future = executor.submit(
                                 _upload_blob_bytes,
                                 bucket,
                                 blob_path,
                                 image_bytes,
                                 mime_type,
-                            ): (page_number, blob_path)
-                            for blob_path, image_bytes, mime_type, page_number in pending_uploads
-                        }
-                        for future in as_completed(futures):
-                            ok = future.result()
-                            page_number, _ = futures[future]
-                            if ok:
-                                uploaded_pages.add(page_number)
-                            else:
-                                failed_uploads += 1
-                            progress.update(1)
+                            )
+                            futures[future] = page_number
+                        finally:
+                            if img is not None:
+                                img.close()
+                            page.close()
+
+                    for future in as_completed(futures):
+                        if future.result():
+                            uploaded_pages.add(futures[future])
+                        else:
+                            failed_uploads += 1
+                        progress.update(1)
 
-                if tuner is not None:
+                start = end
+                if tuner is not None and futures:
                     elapsed = time.perf_counter() - batch_started_at
                     tuner.record_batch(
-                        items=len(pending_uploads),
+                        items=len(futures),
                         seconds=elapsed,
                         had_errors=failed_uploads > 0,
                     )
@@ -521,12 +599,15 @@ def upload_missing_images(
     }
 
     tuner = _make_upload_tuner()
+    image_settings = preprocess_settings(config.image_settings)
     fallback_batch_limit = max(1, int(config.batch_upload_limit or 1))
     uploaded: list[str] = []
     total_candidates = len(candidate_paths)
     cursor = 0
     batch_index = 0
-    with tqdm(total=total_candidates, desc="Uploading images", unit="img") as progress:
+    with tqdm(
+        total=total_candidates, desc="Uploading images", unit="img"
+    ) as progress, _upload_preprocess_pool() as preprocess_pool:
         while cursor < total_candidates:
             batch_index += 1
             batch_limit = _effective_batch_limit(tuner)
@@ -534,9 +615,12 @@ def upload_missing_images(
                 batch_limit = fallback_batch_limit
             current_batch = candidate_paths[cursor: cursor + batch_limit]
             cursor += len(current_batch)
-            pending_uploads: list[tuple[str, bytes, str]] = []
             batch_started_at = time.perf_counter()
+            workers = _effective_workers(tuner)
+            progress.set_postfix_str(f"batch {batch_index} w={workers}")
+            failed_uploads = 0
 
+            to_process: list[tuple[Path, str]] = []
             for local_path in current_batch:
                 if not local_path.exists() or not local_path.is_file():
                     progress.update(1)
@@ -552,60 +636,45 @@ def upload_missing_images(
                 if blob_path in existing:
                     progress.update(1)
                     continue
-                try:
-                    with Image.open(local_path) as img:
-                        image_bytes, mime_type, _ = _apply_image_settings(img)
-                except (UnidentifiedImageError, OSError) as exc:
-                    tqdm.write(f"Skipping unreadable image: {local_path} ({exc})")
-                    progress.update(1)
-                    continue
-                pending_uploads.append((blob_path, image_bytes, mime_type))
-
-            workers = _effective_workers(tuner)
-            progress.set_postfix_str(f"batch {batch_index} w={workers}")
-            failed_uploads = 0
-            if workers == 1 or len(pending_uploads) <= 1:
-                for blob_path, image_bytes, mime_type in pending_uploads:
-                    ok = _upload_blob_bytes(
-                        bucket=active_bucket,
-                        blob_path=blob_path,
-                        image_bytes=image_bytes,
-                        mime_type=mime_type,
+                to_process.append((local_path, blob_path))
+
+            # Images are preprocessed across CPU cores and each upload is
+            # submitted as soon as its image is ready, so encoding overlaps
+            # with network I/O for earlier images.
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                for local_path, blob_path, result, error in _iter_preprocessed_images(
+                    to_process,
+                    image_settings,
+                    preprocess_pool,
+                ):
+                    if error is not None:
+                        tqdm.write(f"Skipping unreadable image: {local_path} ({error})")
+                        progress.update(1)
+                        continue
+                    image_bytes, mime_type = result
+                    future = executor.submit(
+                        _upload_blob_bytes,
+                        active_bucket,
+                        blob_path,
+                        image_bytes,
+                        mime_type,
                     )
-                    if ok:
+                    futures[future] = blob_path
+
+                for future in as_completed(futures):
+                    blob_path = futures[future]
+                    if future.result():
                         existing.add(blob_path)
                         uploaded.append(blob_path)
                     else:
                         failed_uploads += 1
                     progress.update(1)
-            else:
-                with ThreadPoolExecutor(
-                    max_workers=min(workers, len(pending_uploads))
-                ) as executor:
-                    futures = {
-                        executor.submit(
-                            _upload_blob_bytes,
-                            active_bucket,
-                            blob_path,
-                            image_bytes,
-                            mime_type,
-                        ): blob_path
-                        for blob_path, image_bytes, mime_type in pending_uploads
-                    }
-                    for future in as_completed(futures):
-                        ok = future.result()
-                        blob_path = futures[future]
-                        if ok:
-                            existing.add(blob_path)
-                            uploaded.append(blob_path)
-                        else:
-                            failed_uploads += 1
-                        progress.update(1)
 
-            if tuner is not None and pending_uploads:
+            if tuner is not None and futures:
                 elapsed = time.perf_counter() - batch_started_at
                 tuner.record_batch(
-                    items=len(pending_uploads),
+                    items=len(futures),
                     seconds=elapsed,
                     had_errors=failed_uploads > 0,
                 )
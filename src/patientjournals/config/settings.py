@@ -1,11 +1,13 @@
 import json
 import os
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Literal, Optional
 
 from pydantic import BaseModel
 
+from patientjournals.config.prompts import DEFAULT_PROMPTS
 from patientjournals.config.schemas import FrontPage
 from patientjournals.shared.local_secrets import load_local_api_keys
 
@@ -59,7 +61,17 @@ def _default_api_key() -> str:
     return _load_provider_api_keys().get("gemini", "")
 
 
-@dataclass
+@lru_cache(maxsize=16)
+def _output_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    # __post_init__ runs again on every runtime override; the schema only
+    # depends on the model class, so walk it once per class. Callers treat the
+    # result as read-only.
+    return model.model_json_schema()
+
+
+# slots: attribute reads on the shared config are hot across the pipeline.
+# Not frozen, since runtime overrides and tests assign to it.
+@dataclass(slots=True)
 class Config:
     model: str = "gemini-3.1-pro"
     input_prompt_name: str = "frontpage"  # change to correct prompt
@@ -78,10 +90,30 @@ class Config:
     provider_api_keys: dict[str, str] = field(default_factory=_load_provider_api_keys)
     api_key: str = field(default_factory=_default_api_key)
     api_concurrent_tasks: int = 8
+    # Cap on live API request starts per minute; 0 = no rate limit beyond
+    # api_concurrent_tasks.
+    api_requests_per_minute: int = 0
     api_max_attempts: int = 10
     api_retry_initial_delay_seconds: float = 2.0
     api_retry_max_delay_seconds: float = 30.0
     api_retry_jitter_seconds: float = 0.5
+    # Worker processes for local image preprocessing; 0 = one per CPU, 1 = run
+    # preprocessing in a thread instead of a process pool.
+    local_preprocess_workers: int = 0
+    # On-disk cache of preprocessed page bytes, reused across local runs
+    # (e.g. --continue-dataset retries); empty disables caching.
+    preprocess_cache_dir: str = ""
+    # Size cap for preprocess_cache_dir; least recently used pages are evicted
+    # past it. 0 = unbounded, which grows with every new page or setting.
+    preprocess_cache_max_mb: int = 2048
+    # Pages preprocessed ahead of the API workers, so decode/resize overlaps
+    # in-flight requests; 0 = api_concurrent_tasks.
+    local_prefetch_depth: int = 0
+    # Encoding override for images sent inline to the live API; empty = use
+    # image_settings["output_format"]. "JPEG" keeps request bodies several
+    # times smaller than PNG, but local and batch runs then see different,
+    # lossy inputs for the same scans.
+    local_image_format: str = ""
     verification_model: str = ""
     batch_size: int = 2048
     flush_every: int = 1
@@ -147,6 +179,9 @@ class Config:
     upload_dataset_to_gcs: bool = True
     validations_gcs_prefix: str = "validations"
     upload_validation_to_gcs: bool = True
+    # On-disk cache of the validator's local image index, reused on restart
+    # while no directory under the image root has changed; empty disables it.
+    image_index_cache_dir: str = ""
 
     # Upload/render settings for PDF to GCS image pages
     upload_source: Literal["pdf", "images", "auto"] = "images"
@@ -162,6 +197,10 @@ class Config:
     upload_retry_max_delay_seconds: float = 30.0
     batch_upload_limit: int = 100
     upload_workers: int = 35
+    # Processes preprocessing images before upload; 0 = one per CPU, 1 = in
+    # the uploading thread. Batches of fewer than 8 images always preprocess in
+    # the uploading thread, and the pool is only started once it is needed.
+    upload_preprocess_workers: int = 0
     pdf_render_dpi: int = 300
     page_number_digits: int = 4
     image_settings: dict[str, Any] = field(
@@ -178,44 +217,7 @@ class Config:
         }
     )
 
-    prompts: dict[str, str] = field(
-        default_factory=lambda: {
-            "frontpage": f"""
-                Context:
-                You are given a scanned page from a Danish hospital patient journal from the late 1800s.
-                Your task is to extract data from the content on the page.
-
-                Objective:
-                Fill each column with the information found in the image.
-                Not all columns are present within an image, meaning it isn't necessary to fill out all.
-
-                Guidelines:
-                - Examples are always written as 'Examples: [example1,example2,example3]'
-                - Use only what is visible in the image.
-                - Do not infer or guess beyond the evidence on the page.
-                - Preserve spellings exactly as written, even if archaic or non-standard. Only exception is numbers, which should be written as float-values.
-                - If nothing fits a Field, output an empty field for that position.
-                - If a line is crossed out, it should not be included in the datapoint of which it's relevant to.
-                """,
-            "textpage": """
-                **Role:**
-                You are an expert archivist specializing in late 19th-century Danish medical manuscripts. Your task is to transcribe the provided handwritten journal page into a structured JSON format, maintaining strict fidelity to the original text.
-                
-                **Scope & Focus:**
-                *   **Primary Page Only:** Transcribe **ONLY** the single page that is centered and in focus.
-                *   **Ignore Surroundings:** Strictly ignore any text visible on the facing page (across the binding/gutter) or any text cut off at the far edges of the image.
-                *   **Visual Boundaries:** The page usually has a vertical fold or red line separating the left-hand date margin from the main body. Do not transcribe text found outside the physical boundaries of the current page.
-                
-                **Transcription Rules:**
-                1.  **Line-by-Line:** Output a JSON object for every distinct vertical line of writing. Do not merge lines.
-                2.  **Margins:** If a date (e.g., "18/12") appears in the left margin, capture it in the `metadata` field. If the margin is blank for that line, leave it as a `None`-value.
-                3.  **Vital Signs Columns:** The text frequently breaks into columns of numbers (Time | Temp | Pulse). Transcribe these exactly as they appear visually within the `text` field, preserving spaces between numbers (e.g., `12   39,6   39`).
-                4.  **Language & Spelling:**
-                    *   Preserve archaic Danish spelling exactly (e.g., write "The" not "Te", "Smerter", "aa" instead of "å").
-                    *   Keep all medical abbreviations (e.g., "Rp.", "Tp.", "P.", "Steth.", "dgl.").
-                """,
-        }
-    )
+    prompts: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_PROMPTS))
 
     # backend for config
     output_schema: dict[str, Any] = field(init=False)
@@ -244,7 +246,7 @@ class Config:
         )
         if not (self.api_key or "").strip():
             self.api_key = self.provider_api_keys.get("gemini", "")
-        self.output_schema = self.output_model.model_json_schema()
+        self.output_schema = _output_json_schema(self.output_model)
         _ = self.input_prompt
 
     def api_key_for_provider(self, provider: str) -> str:
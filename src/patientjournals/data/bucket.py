@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import fnmatch
+import os
 from collections import Counter, defaultdict
 from datetime import datetime
 from io import BytesIO
@@ -17,6 +17,7 @@ from patientjournals.data.inspection import (
     configured_image_extensions,
     _numeric_stats,
 )
+from patientjournals.shared.tools import _glob_match
 
 
 def resolve_bucket_name(bucket_name: str | None = None) -> str:
@@ -98,10 +99,9 @@ def _folder_names_from_blob(blob_name: str, prefix: str) -> set[str]:
     return folders
 
 
-def _matches_glob(blob: object, glob_pattern: str | None) -> bool:
-    pattern = glob_pattern or "*"
+def _matches_glob(blob: object, matches) -> bool:
     name = str(getattr(blob, "name", "") or "")
-    return fnmatch.fnmatch(Path(name).name, pattern)
+    return matches(os.path.normcase(name.rpartition("/")[2])) is not None
 
 
 def _content_type_format_issue(blob: object, image_format: str | None) -> str | None:
@@ -147,12 +147,13 @@ def select_bucket_image_blobs(
     allowed_extensions: set[str] | None = None,
 ) -> list[object]:
     extensions = allowed_extensions or configured_image_extensions()
+    matches = _glob_match(glob_pattern or "*")
     return [
         blob
         for blob in blobs
         if not _is_folder_placeholder(blob)
         and _blob_extension(blob) in extensions
-        and _matches_glob(blob, glob_pattern)
+        and _matches_glob(blob, matches)
     ]
 
 
@@ -1,18 +1,28 @@
 import asyncio
+import functools
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable
 from pydantic import BaseModel
 
-from patientjournals.shared.preprocess import preprocess_image_with_metadata
+from patientjournals.shared.preprocess import (
+    cached_preprocess_image_with_metadata,
+    preprocess_settings,
+)
 from patientjournals.config import config
 from patientjournals.local.model_client import LocalModelClient
 from patientjournals.shared.api_retry import (
+    AsyncRateLimiter,
     is_fatal_api_error as _is_fatal_api_error,
     is_retryable_api_error as _is_retryable_api_error,
     retry_delay_seconds as _retry_delay_seconds,
 )
 from patientjournals.shared.processing_metrics import base_image_record, utc_now_iso
+from patientjournals.shared.response_parsing import parse_output
 from patientjournals.shared.tools import data_to_rows
 
 
@@ -22,19 +32,102 @@ class ProcessedFileResult:
     metrics: dict[str, Any]
 
 
+def _preprocess_worker_count() -> int:
+    workers = int(config.local_preprocess_workers or 0)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+class PreprocessPool:
+    """Process pool owned by a single local run, so concurrent runs never
+    share, replace or cancel each other's preprocessing."""
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.workers = _preprocess_worker_count() if workers is None else workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn instead of fork: local runs are started from threaded hosts.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # Concurrent pages all see the same broken executor; only the first
+        # one drops it, so a replacement built meanwhile is left alone.
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False)
+
+    async def run(self, fn: Callable[[], Any]) -> Any:
+        # PIL work holds the GIL for most of decode/resize/encode, so threads
+        # barely overlap; a process pool gives real parallelism across pages.
+        if self.workers <= 1:
+            return await asyncio.to_thread(fn)
+        loop = asyncio.get_running_loop()
+        executor = self._get()
+        try:
+            return await loop.run_in_executor(executor, fn)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory on a huge scan) and the
+            # pool rejects all further work; replace it and retry once.
+            self._discard(executor)
+        executor = self._get()
+        try:
+            return await loop.run_in_executor(executor, fn)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def local_preprocess_settings() -> dict[str, Any]:
+    settings = preprocess_settings(config.image_settings)
+    if config.local_image_format:
+        settings["output_format"] = config.local_image_format
+    return settings
+
+
+async def preprocess_file(
+    file_name: str,
+    preprocess_kwargs: dict[str, Any] | None = None,
+    pool: PreprocessPool | None = None,
+) -> tuple[bytes, str, dict[str, Any]]:
+    if preprocess_kwargs is None:
+        preprocess_kwargs = local_preprocess_settings()
+    preprocess = functools.partial(
+        cached_preprocess_image_with_metadata,
+        file_name,
+        cache_dir=config.preprocess_cache_dir or None,
+        cache_max_bytes=int(config.preprocess_cache_max_mb or 0) << 20,
+        **preprocess_kwargs,
+    )
+    if pool is None:
+        return await asyncio.to_thread(preprocess)
+    return await pool.run(preprocess)
+
+
 async def generate_data(
     model_client: LocalModelClient,
     file_name: str,
+    preprocess_kwargs: dict[str, Any] | None = None,
+    limiter: AsyncRateLimiter | None = None,
+    preprocessed: tuple[bytes, str, dict[str, Any]] | None = None,
 ) -> tuple[BaseModel, float, dict[str, Any], dict[str, Any]]:
-    image_bytes, mime_type, preprocessing = await asyncio.to_thread(
-        preprocess_image_with_metadata,
-        file_name,
-        max_dim=config.image_settings.get("max_dim", 3000),
-        margins=tuple(config.image_settings.get("margins", (0, 0, 0, 0))),
-        contrast_factor=config.image_settings.get("contrast_factor", 1.0),
-        output_format=config.image_settings.get("output_format", "PNG"),
-    )
+    if preprocessed is None:
+        preprocessed = await preprocess_file(file_name, preprocess_kwargs)
+    image_bytes, mime_type, preprocessing = preprocessed
 
+    if limiter is not None:
+        await limiter.acquire()
     start_time = time.perf_counter()
     output = await model_client.generate_json(
         image_bytes=image_bytes,
@@ -50,24 +143,53 @@ async def generate_data(
     payload_text = metadata.get("text")
     if not isinstance(payload_text, str) or not payload_text.strip():
         raise ValueError("Empty response text from API.")
+    parsed = await asyncio.to_thread(
+        parse_output,
+        config.output_model,
+        payload_text,
+        output.parsed,
+    )
     return (
-        config.output_model.model_validate_json(payload_text),
+        parsed,
         duration,
         metadata,
         preprocessing,
     )
 
 
-async def process_file(sem, model_client, file_name, log):
+async def process_file(
+    sem,
+    model_client,
+    file_name,
+    log,
+    preprocess_kwargs=None,
+    limiter=None,
+    prepared=None,
+    pool=None,
+):
+    # `prepared` is a task running preprocess_file() started ahead of time by
+    # the caller; either way a successful preprocess is reused across
+    # attempts. A failed one is not: the next attempt preprocesses again.
+    preprocessed = None
     async with sem:
         max_attempts = max(1, int(config.api_max_attempts))
         started_at = utc_now_iso()
         total_started = time.perf_counter()
         for attempt in range(1, max_attempts + 1):
             try:
+                if preprocessed is None:
+                    if prepared is not None:
+                        pending, prepared = prepared, None
+                        preprocessed = await pending
+                    else:
+                        preprocessed = await preprocess_file(
+                            file_name, preprocess_kwargs, pool
+                        )
                 journal_data, duration, metadata, preprocessing = await generate_data(
                     model_client=model_client,
                     file_name=file_name,
+                    limiter=limiter,
+                    preprocessed=preprocessed,
                 )
                 rows = data_to_rows(
                     data=journal_data,
@@ -6,7 +6,11 @@ from dataclasses import dataclass
 from typing import Any
 
 from patientjournals.config import config
-from patientjournals.shared.generation_spec import build_live_generation_config, build_live_request_contents
+from patientjournals.shared.generation_spec import (
+    build_live_generation_config,
+    build_live_request_contents,
+    live_http_options,
+)
 from patientjournals.config.models import ModelSpec, ProviderName, resolve_model_spec
 from patientjournals.shared.response_parsing import extract_response_metadata
 
@@ -28,6 +32,7 @@ class LocalGenerationResult:
     text: str
     thoughts: str | None = None
     field_confidence_by_pointer: dict[str, dict[str, float | None]] | None = None
+    parsed: object = None
 
 
 def _import_openai_async_client():
@@ -52,13 +57,16 @@ def _import_anthropic_async_client():
     return AsyncAnthropic
 
 
-def _build_provider_client(provider: ProviderName) -> object:
+def _build_provider_client(
+    provider: ProviderName,
+    http_options: object | None = None,
+) -> object:
     api_key = config.api_key_for_provider(provider)
 
     if provider == "gemini":
         from google import genai
 
-        return genai.Client(api_key=api_key)
+        return genai.Client(api_key=api_key, http_options=http_options)
 
     if provider == "openai":
         AsyncOpenAI = _import_openai_async_client()
@@ -123,7 +131,9 @@ class LocalModelClient:
         self.model_spec: ModelSpec = resolve_model_spec(model_name)
         self.model_name = model_name
         self.provider: ProviderName = self.model_spec.provider
-        self.client = _build_provider_client(self.provider)
+        self._http_options = live_http_options() if self.provider == "gemini" else None
+        self.client = _build_provider_client(self.provider, self._http_options)
+        self._gemini_generation_config: object | None = None
 
     def capability_warnings(self) -> list[str]:
         warnings: list[str] = []
@@ -154,6 +164,22 @@ class LocalModelClient:
             return await self._generate_with_anthropic(image_bytes=image_bytes, mime_type=mime_type)
         raise ValueError(f"Unsupported provider '{self.provider}'.")
 
+    def _gemini_config(self) -> object:
+        # Validate the request config (including the response schema) into the
+        # SDK type once per client; a run creates one client, so config changes
+        # between runs are still picked up.
+        if self._gemini_generation_config is None:
+            from google.genai import types
+
+            self._gemini_generation_config = types.GenerateContentConfig.model_validate(
+                build_live_generation_config(
+                    include_schema=True,
+                    include_temperature=True,
+                    include_thinking_level=True,
+                )
+            )
+        return self._gemini_generation_config
+
     async def _generate_with_gemini(
         self,
         *,
@@ -163,11 +189,7 @@ class LocalModelClient:
         output = await self.client.aio.models.generate_content(
             model=self.model_name,
             contents=build_live_request_contents(image_bytes=image_bytes, mime_type=mime_type),
-            config=build_live_generation_config(
-                include_schema=True,
-                include_temperature=True,
-                include_thinking_level=True,
-            ),
+            config=self._gemini_config(),
         )
         metadata = extract_response_metadata(output)
         text = metadata.get("text")
@@ -177,6 +199,7 @@ class LocalModelClient:
             text=text,
             thoughts=metadata.get("thoughts"),
             field_confidence_by_pointer=metadata.get("field_confidence_by_pointer") or {},
+            parsed=getattr(output, "parsed", None),
         )
 
     async def _generate_with_openai(
@@ -264,6 +287,8 @@ class LocalModelClient:
         )
 
     async def aclose(self) -> None:
+        if self._http_options is not None:
+            await self._http_options.httpx_async_client.aclose()
         close_candidates = ("aclose", "close")
         for method_name in close_candidates:
             method = getattr(self.client, method_name, None)
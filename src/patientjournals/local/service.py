@@ -6,20 +6,29 @@ from pathlib import Path
 from typing import Callable
 
 from patientjournals.config import config
-from patientjournals.local.generate import process_file
+from patientjournals.local.generate import (
+    PreprocessPool,
+    local_preprocess_settings,
+    preprocess_file,
+    process_file,
+)
 from patientjournals.local.model_client import create_local_model_client
-from patientjournals.shared.identity import ensure_unique_image_names, image_name_from_reference
+from patientjournals.shared.api_retry import build_rate_limiter
+from patientjournals.shared.identity import (
+    ensure_unique_image_names,
+    image_name_from_reference,
+    row_image_name,
+)
 from patientjournals.shared.processing_metrics import (
     MANIFEST_FILE_NAME,
     append_processing_record,
     write_processing_summary,
 )
 from patientjournals.shared.tools import (
-    build_image_name_id_set,
+    DatasetWriter,
     create_subfolder,
     filter_dataset_by_image_names,
     find_newest_dataset,
-    flush_rows,
     get_run_logger,
     list_input_files,
     load_existing_dataset,
@@ -89,11 +98,15 @@ def _emit(callback: ProgressCallback | None, progress: LocalRunProgress) -> None
         callback(progress)
 
 
-def _input_without_existing(data: list[str], existing_names: set[str]) -> list[str]:
+def _input_without_existing(
+    data: list[str],
+    data_names: list[str | None],
+    existing_names: set[str],
+) -> list[str]:
     return [
         path
-        for path in data
-        if image_name_from_reference(path) not in existing_names
+        for path, name in zip(data, data_names)
+        if name not in existing_names
     ]
 
 
@@ -114,7 +127,10 @@ async def run_local_job(
         "fp_suffix": config.fp_suffix,
     }
     data = list_input_files(selection_cfg)
-    ensure_unique_image_names(data, source_label="selected local input files")
+    # Resolve every path's image name once; the id set and the continue
+    # filter below both reuse it.
+    data_names = [image_name_from_reference(path) for path in data]
+    ensure_unique_image_names(data_names, source_label="selected local input files")
 
     flush_every = max(1, int(config.flush_every))
     rows: list[dict] = []
@@ -131,7 +147,7 @@ async def run_local_job(
     covered_before = 0
     skipped = 0
     normalized_existing: set[str] = set()
-    input_ids = build_image_name_id_set(data)
+    input_ids = {name for name in data_names if name}
     if request.continue_dataset:
         continue_path = request.continue_dataset
         if continue_path.lower() == "newest":
@@ -157,7 +173,7 @@ async def run_local_job(
             output_format=output_format,
         )
         original_count = len(data)
-        data = _input_without_existing(data, normalized_existing)
+        data = _input_without_existing(data, data_names, normalized_existing)
         skipped = original_count - len(data)
         header_written = filtered_count > 0
         total_written = filtered_count
@@ -178,9 +194,16 @@ async def run_local_job(
         ),
     )
 
+    writer = DatasetWriter(out_path, output_format, header_written=header_written)
+    # Tracked as rows are written so coverage needs no re-read of the output.
+    written_names = set(normalized_existing)
     sem = asyncio.Semaphore(config.api_concurrent_tasks)
+    worker_count = min(len(data), max(1, int(config.api_concurrent_tasks)))
+    prefetch_depth = int(config.local_prefetch_depth or 0) or worker_count
+    prepared: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch_depth))
     tasks: list[asyncio.Task] = []
     processed_images = 0
+    preprocess_pool = PreprocessPool()
     try:
         log(
             f"Local model provider resolved: model={model_client.model_name} "
@@ -196,13 +219,61 @@ async def run_local_job(
             f"fp_mode={selection_cfg['fp_mode']} "
             f"Output={out_path.name}"
         )
-        tasks = [
-            asyncio.create_task(process_file(sem, model_client, path, log))
-            for path in data
-        ]
-
-        for task in asyncio.as_completed(tasks):
-            result = await task
+        if len(data) >= int(config.batch_size or 0) > 0:
+            log(
+                f"{len(data)} images exceed batch_size={config.batch_size}; the "
+                "batch workflow (batch.submit / batch.retrieve) is cheaper and "
+                "schedules the requests server-side for large offline runs."
+            )
+        preprocess_kwargs = local_preprocess_settings()
+        limiter = build_rate_limiter()
+        # A producer starts preprocessing up to local_prefetch_depth pages
+        # ahead, so decode/resize overlaps in-flight API calls. A fixed pool of
+        # api_concurrent_tasks workers consumes them, however large the input.
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def producer() -> None:
+            for path in data:
+                task = asyncio.create_task(
+                    preprocess_file(path, preprocess_kwargs, preprocess_pool)
+                )
+                await prepared.put((path, task))
+            for _ in range(worker_count):
+                await prepared.put(None)
+
+        async def worker() -> None:
+            while (item := await prepared.get()) is not None:
+                path, preprocess_task = item
+                try:
+                    result = await process_file(
+                        sem,
+                        model_client,
+                        path,
+                        log,
+                        preprocess_kwargs,
+                        limiter,
+                        prepared=preprocess_task,
+                        pool=preprocess_pool,
+                    )
+                except Exception as exc:  # noqa: BLE001 - re-raised by the consumer
+                    results.put_nowait(exc)
+                    return
+                except BaseException as exc:
+                    # Cancellation must reach the consumer too, or it waits
+                    # forever for this image's result.
+                    results.put_nowait(
+                        RuntimeError(f"Processing {path} was interrupted: {exc!r}")
+                    )
+                    raise
+                results.put_nowait(result)
+
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(worker_count)]
+
+        for _ in range(len(data)):
+            result = await results.get()
+            if isinstance(result, Exception):
+                raise result
             processed_images += 1
             append_processing_record(manifest_path, result.metrics)
             generated_rows = result.rows
@@ -222,13 +293,11 @@ async def run_local_job(
             )
 
             if len(rows) >= flush_every:
-                flush_count = len(rows)
-                header_written = flush_rows(
-                    rows=rows,
-                    out_path=str(out_path),
-                    header_written=header_written,
-                    output_format=output_format,
-                )
+                flush_count = writer.write_rows(rows)
+                written_names.update(map(row_image_name, rows))
+                # Hand each flush to the OS so an interrupted run can still be
+                # continued from what was written.
+                writer.flush()
                 total_written += flush_count
                 log(
                     f"Flushed {flush_count} row(s) to {out_path.name} "
@@ -239,6 +308,11 @@ async def run_local_job(
     except Exception as exc:
         for task in tasks:
             task.cancel()
+        while not prepared.empty():
+            item = prepared.get_nowait()
+            if item is not None:
+                item[1].cancel()
+        writer.close()
         write_run_error(run_dir, exc)
         log("Stopping early due to error.", exc=exc)
         try:
@@ -262,18 +336,15 @@ async def run_local_job(
 
     finally:
         await model_client.aclose()
+        await asyncio.to_thread(preprocess_pool.shutdown)
 
     if rows:
-        header_written = flush_rows(
-            rows=rows,
-            out_path=str(out_path),
-            header_written=header_written,
-            output_format=output_format,
-        )
-        total_written += len(rows)
+        total_written += writer.write_rows(rows)
+        written_names.update(map(row_image_name, rows))
         log(f"Wrote final batch of {len(rows)} rows.")
     elif total_written == 0:
         log("No rows written; output file may be missing.")
+    writer.close()
 
     summary_path = write_processing_summary(run_dir)
     log(f"Wrote image processing manifest: {manifest_path.name}")
@@ -286,13 +357,7 @@ async def run_local_job(
         except Exception as exc:  # noqa: BLE001
             log("Dataset upload skipped or failed.", exc=exc)
 
-    covered_after = total_written
-    try:
-        _, final_files, _ = load_existing_dataset(out_path, output_format)
-        final_ids = final_files
-        covered_after = len(input_ids & final_ids)
-    except FileNotFoundError:
-        covered_after = len(input_ids & normalized_existing) if request.continue_dataset else 0
+    covered_after = len(input_ids & written_names)
 
     result = LocalRunResult(
         status="finished",
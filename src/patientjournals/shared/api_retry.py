@@ -1,3 +1,4 @@
+import asyncio
 import random
 
 from patientjournals.config import config
@@ -18,7 +19,28 @@ def is_fatal_api_error(exc: BaseException) -> bool:
     return any(marker in text for marker in fatal_markers)
 
 
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _api_status_code(exc: BaseException) -> int | None:
+    # google-genai errors carry ``code``; anthropic/httpx-style errors carry
+    # ``status_code`` on the exception or its response.
+    for value in (
+        getattr(exc, "code", None),
+        getattr(exc, "status_code", None),
+        getattr(getattr(exc, "response", None), "status_code", None),
+    ):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
 def is_retryable_api_error(exc: BaseException) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    status_code = _api_status_code(exc)
+    if status_code is not None:
+        return status_code in _RETRYABLE_STATUS_CODES
     text = str(exc).lower()
     retryable_markers = (
         "503",
@@ -47,3 +69,38 @@ def retry_delay_seconds(attempt: int) -> float:
     if jitter > 0:
         delay += random.uniform(0, jitter)
     return delay
+
+
+class AsyncRateLimiter:
+    """Space request starts so at most ``max_rate`` begin per ``time_period`` seconds.
+
+    Unlike a semaphore this bounds the request rate rather than the number in
+    flight, so fast responses cannot burst past the provider's RPM limit.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 60.0) -> None:
+        if max_rate <= 0:
+            raise ValueError("max_rate must be positive.")
+        self._interval = float(time_period) / float(max_rate)
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+def build_rate_limiter() -> AsyncRateLimiter | None:
+    rpm = float(config.api_requests_per_minute or 0)
+    if rpm <= 0:
+        return None
+    return AsyncRateLimiter(rpm, 60.0)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 
 import pandas as pd
@@ -10,14 +9,16 @@ from patientjournals.shared.identity import (
     image_name_from_reference,
     row_image_name,
 )
-from patientjournals.shared.tools import find_newest_dataset
-
-
-def _normalize_output_format(output_format: str) -> str:
-    fmt = output_format.strip().lower().lstrip(".")
-    if fmt not in {"csv", "jsonl"}:
-        raise ValueError(f"Unsupported output_format: {output_format}")
-    return fmt
+from patientjournals.shared.tools import (
+    _csv_row_image_names,
+    _filter_csv_by_image_names,
+    _identity_usecols,
+    _json_loads,
+    _jsonl_may_name,
+    _jsonl_line,
+    _normalize_output_format,
+    find_newest_dataset,
+)
 
 
 def normalize_gcs_file_key(
@@ -75,15 +76,15 @@ def load_dataset_image_coverage(
     row_count = 0
 
     if fmt == "jsonl":
-        with open(path, "r", encoding="utf-8") as handle:
+        with open(path, "rb") as handle:
             for line in handle:
                 raw = line.strip()
                 if not raw:
                     continue
                 row_count += 1
                 try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
+                    payload = _json_loads(raw)
+                except ValueError:
                     continue
                 if not isinstance(payload, dict):
                     continue
@@ -92,12 +93,9 @@ def load_dataset_image_coverage(
                     image_names.add(image_name)
         return fmt, image_names, row_count
 
-    df = pd.read_csv(path, sep=csv_sep)
+    df = pd.read_csv(path, sep=csv_sep, usecols=_identity_usecols(path, csv_sep))
     row_count = len(df)
-    for row in df.to_dict("records"):
-        image_name = row_image_name(row)
-        if image_name:
-            image_names.add(image_name)
+    image_names.update(filter(None, _csv_row_image_names(df)))
     return fmt, image_names, row_count
 
 
@@ -132,18 +130,16 @@ def copy_dataset_rows_for_image_names(
 
     if fmt == "jsonl":
         kept = 0
-        with open(src, "r", encoding="utf-8") as src_handle, open(
-            dest,
-            "w",
-            encoding="utf-8",
-        ) as dest_handle:
+        with open(src, "rb") as src_handle, open(dest, "wb") as dest_handle:
             for line in src_handle:
                 raw = line.strip()
                 if not raw:
                     continue
+                if image_names is not None and not _jsonl_may_name(raw, image_names):
+                    continue
                 try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
+                    payload = _json_loads(raw)
+                except ValueError:
                     continue
                 if not isinstance(payload, dict):
                     continue
@@ -151,30 +147,11 @@ def copy_dataset_rows_for_image_names(
                 if image_names is not None:
                     if image_name not in image_names:
                         continue
-                raw = json.dumps(payload, ensure_ascii=False, default=str)
-                dest_handle.write(raw)
-                dest_handle.write("\n")
+                dest_handle.write(_jsonl_line(payload))
                 kept += 1
         return kept
 
-    df = pd.read_csv(src, sep=csv_sep)
-    if image_names is not None:
-        mask = df.apply(
-            lambda row: row_image_name(row.to_dict()) in image_names,
-            axis=1,
-        )
-        df = df[mask]
-    if len(df) and "image_name" not in df.columns:
-        df.insert(
-            0,
-            "image_name",
-            [row_image_name(row) for row in df.to_dict("records")],
-        )
-    elif len(df):
-        df["image_name"] = [
-            row.get("image_name") or row_image_name(row)
-            for row in df.to_dict("records")
-        ]
+    df = _filter_csv_by_image_names(pd.read_csv(src, sep=csv_sep), image_names)
     df.to_csv(dest, index=False, sep=csv_sep)
     return len(df)
 
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from functools import lru_cache
+import importlib.util
+
+import httpx
 from google.genai import types
 
 from patientjournals.config import config
@@ -36,13 +40,41 @@ def _thinking_config_batch() -> dict[str, object] | None:
     return payload or None
 
 
+@lru_cache(maxsize=8)
+def _prompt_part(text: str) -> types.Part:
+    # Keyed on the prompt text, so switching config.input_prompt_name still works.
+    return types.Part.from_text(text=text)
+
+
 def build_live_request_contents(image_bytes: bytes, mime_type: str) -> list[object]:
     return [
         types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-        prompt_text(),
+        _prompt_part(prompt_text()),
     ]
 
 
+def live_http_options() -> types.HttpOptions:
+    """HTTP options for live Gemini clients, pooled for api_concurrent_tasks.
+
+    httpx keeps only 20 idle connections by default; with more concurrent
+    requests than that, connections are closed and re-handshaken per request.
+    The SDK does not close a client it was handed, so callers close
+    ``httpx_async_client`` themselves.
+    """
+    concurrency = max(1, int(config.api_concurrent_tasks or 1))
+    # Passed as a client rather than async_client_args: those are forwarded
+    # to aiohttp when it is installed, which rejects httpx-only keywords.
+    async_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max(100, concurrency * 2),
+            max_keepalive_connections=max(20, concurrency),
+        ),
+        http2=importlib.util.find_spec("h2") is not None,
+        follow_redirects=True,
+    )
+    return types.HttpOptions(httpx_async_client=async_client)
+
+
 def build_live_generation_config(
     *,
     include_schema: bool,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from collections import Counter
 from pathlib import Path
 from typing import Iterable
@@ -26,7 +27,8 @@ def image_name_from_reference(value: object) -> str | None:
     text = _strip_gcs_bucket(text).strip("/")
     if not text:
         return None
-    name = Path(text).name
+    # Called for every row/reference; basename avoids building a Path object.
+    name = os.path.basename(text)
     return name or None
 
 
@@ -44,18 +46,20 @@ def image_name_from_gcs_object(object_name: str) -> str:
     return name
 
 
+# Columns row_image_name() reads, in priority order.
+IDENTITY_SOURCE_COLUMNS = (
+    IDENTITY_COLUMN,
+    LEGACY_SOURCE_COLUMN,
+    "source_path",
+    "gcs_object",
+    "gcs_uri",
+    "relative_path",
+    "blob_name",
+)
+
+
 def row_image_name(row: dict) -> str | None:
-    direct = image_name_from_reference(row.get(IDENTITY_COLUMN))
-    if direct:
-        return direct
-    for column in (
-        LEGACY_SOURCE_COLUMN,
-        "source_path",
-        "gcs_object",
-        "gcs_uri",
-        "relative_path",
-        "blob_name",
-    ):
+    for column in IDENTITY_SOURCE_COLUMNS:
         name = image_name_from_reference(row.get(column))
         if name:
             return name
@@ -91,13 +95,20 @@ def build_image_name_set(references: Iterable[object]) -> set[str]:
     return names
 
 
-def duplicate_image_names(references: Iterable[object]) -> set[str]:
+def image_names_with_duplicates(
+    references: Iterable[object],
+) -> tuple[set[str], set[str]]:
+    """Return (all image names, duplicated image names) in a single pass."""
     counts = Counter(
         image_name
         for value in references
         if (image_name := image_name_from_reference(value))
     )
-    return {name for name, count in counts.items() if count > 1}
+    return set(counts), {name for name, count in counts.items() if count > 1}
+
+
+def duplicate_image_names(references: Iterable[object]) -> set[str]:
+    return image_names_with_duplicates(references)[1]
 
 
 def ensure_unique_image_names(
@@ -72,6 +72,11 @@ def _build_confidence_tree(
     return _leaf_confidence_payload(field_confidence_by_pointer, pointer)
 
 
+def _dump(data: BaseModel) -> dict:
+    # Call the compiled serializer directly; equivalent to model_dump(mode="python").
+    return type(data).__pydantic_serializer__.to_python(data)
+
+
 def _has_field_confidence(
     field_confidence_by_pointer: FieldConfidenceByPointer | None,
 ) -> bool:
@@ -83,7 +88,7 @@ def journal_rows(
     file_name: str,
     field_confidence_by_pointer: FieldConfidenceByPointer | None = None,
 ) -> list[dict]:
-    row = data.model_dump(mode="python")
+    row = _dump(data)
     if _has_field_confidence(field_confidence_by_pointer):
         row["field_confidence"] = _build_confidence_tree(
             row,
@@ -99,29 +104,36 @@ def text_page_rows(
     file_name: str,
     field_confidence_by_pointer: FieldConfidenceByPointer | None = None,
 ) -> list[dict]:
-    page_level = data.model_dump(mode="python", exclude={"page_lines"})
+    page_level = _dump(data)
+    page_lines = page_level.pop("page_lines", None) or []
+    with_confidence = _has_field_confidence(field_confidence_by_pointer)
+    page_level_confidence = (
+        _build_confidence_tree(
+            page_level,
+            field_confidence_by_pointer,
+            path=(),
+        )
+        if with_confidence
+        else None
+    )
+    identity = identity_columns(file_name)
     rows: list[dict] = []
-    for index, line in enumerate(data.page_lines):
-        row = line.model_dump(mode="python")
+    for index, line in enumerate(page_lines):
+        row = dict(line)
         row.update(page_level)
-        if _has_field_confidence(field_confidence_by_pointer):
+        if with_confidence:
             line_confidence = _build_confidence_tree(
-                line.model_dump(mode="python"),
+                line,
                 field_confidence_by_pointer,
                 path=("page_lines", str(index)),
             )
-            page_level_confidence = _build_confidence_tree(
-                page_level,
-                field_confidence_by_pointer,
-                path=(),
-            )
             confidence_payload: dict[str, object] = {}
             if isinstance(line_confidence, dict):
                 confidence_payload.update(line_confidence)
             if isinstance(page_level_confidence, dict):
                 confidence_payload.update(page_level_confidence)
             row["field_confidence"] = confidence_payload
-        row.update(identity_columns(file_name))
+        row.update(identity)
         rows.append(row)
     return rows
 
@@ -131,7 +143,7 @@ def default_rows(
     file_name: str,
     field_confidence_by_pointer: FieldConfidenceByPointer | None = None,
 ) -> list[dict]:
-    row = data.model_dump(mode="python")
+    row = _dump(data)
     if _has_field_confidence(field_confidence_by_pointer):
         row["field_confidence"] = _build_confidence_tree(
             row,
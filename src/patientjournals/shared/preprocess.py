@@ -1,31 +1,65 @@
 from pathlib import Path
 from io import BytesIO
+import hashlib
 import io
-from mimetypes import guess_type
+import json
+import os
+import struct
 
 from PIL import Image, ImageEnhance
-from google import genai
-from google.genai import types
 
 
-def load_image(path):
+def preprocess_settings(image_settings=None):
+    """Resolve config.image_settings into preprocess keyword arguments."""
+    settings = image_settings or {}
+    return {
+        "max_dim": settings.get("max_dim", 3000),
+        "margins": tuple(settings.get("margins", (0, 0, 0, 0))),
+        "contrast_factor": settings.get("contrast_factor", 1.0),
+        "output_format": settings.get("output_format", "PNG"),
+        "quality": settings.get("quality", 90),
+    }
+
+
+def draft_for_max_dim(img, max_dim=3000):
+    """Let libjpeg decode at a reduced DCT scale that still covers max_dim."""
+    if img.format != "JPEG":
+        return img
+    w, h = img.size
+    longest = max(w, h)
+    if longest < 2 * max_dim:
+        return img
+    scale = max_dim / float(longest)
+    img.draft("RGB", (max(1, int(w * scale)), max(1, int(h * scale))))
+    return img
+
+
+def load_image(path, max_dim=None):
     path = Path(path)
     img = Image.open(path)
+    if max_dim is not None:
+        draft_for_max_dim(img, max_dim=max_dim)
     return img.convert("RGB")
 
 
-def resize_image(img, max_dim=3000):
-    w, h = img.size
+def _resized_size(size, max_dim):
+    w, h = size
     longest = max(w, h)
     if longest <= max_dim:
-        return img
+        return size
     scale = max_dim / float(longest)
-    new_size = (int(w * scale), int(h * scale))
+    return (int(w * scale), int(h * scale))
+
+
+def resize_image(img, max_dim=3000):
+    new_size = _resized_size(img.size, max_dim)
+    if new_size == img.size:
+        return img
     return img.resize(new_size, Image.BICUBIC)
 
 
-def crop_margins(img, left=0, top=0, right=0, bottom=0):
-    w, h = img.size
+def _crop_box(size, left=0, top=0, right=0, bottom=0):
+    w, h = size
 
     left = max(0, int(left))
     top = max(0, int(top))
@@ -40,19 +74,71 @@ def crop_margins(img, left=0, top=0, right=0, bottom=0):
     x2 = min(x2, w)
     y2 = min(y2, h)
 
-    return img.crop((x1, y1, x2, y2))
+    return (x1, y1, x2, y2)
+
+
+def crop_margins(img, left=0, top=0, right=0, bottom=0):
+    box = _crop_box(img.size, left, top, right, bottom)
+    if box == (0, 0, *img.size):
+        return img
+    return img.crop(box)
+
+
+def resize_and_crop(img, max_dim=3000, margins=(0, 0, 0, 0)):
+    """Resize to max_dim, then crop margins (given in resized pixels).
+
+    Both steps run as one Image.resize call with a source box, so the full
+    resized page is never materialised. Returns (image, resized_size).
+    """
+    resized_size = _resized_size(img.size, max_dim)
+    x1, y1, x2, y2 = _crop_box(resized_size, *margins)
+    if resized_size == img.size:
+        if (x1, y1, x2, y2) == (0, 0, *img.size):
+            return img, resized_size
+        return img.crop((x1, y1, x2, y2)), resized_size
+    scale_x = img.size[0] / resized_size[0]
+    scale_y = img.size[1] / resized_size[1]
+    source_box = (x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y)
+    return img.resize((x2 - x1, y2 - y1), Image.BICUBIC, box=source_box), resized_size
+
+
+def _float32(value):
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def _contrast_lut(mean, factor):
+    # Mirrors Image.blend(degenerate, img, factor) in float32, truncated and
+    # clipped like Pillow's C loop, so results match ImageEnhance.Contrast.
+    factor = _float32(factor)
+    lut = []
+    for value in range(256):
+        blended = _float32(mean + _float32(factor * (value - mean)))
+        lut.append(min(255, max(0, int(blended))))
+    return lut
 
 
 def enhance_contrast(img, factor=1.0):
     if factor == 1.0:
         return img
-    enhancer = ImageEnhance.Contrast(img)
-    return enhancer.enhance(factor)
+    if img.mode not in ("L", "RGB"):
+        return ImageEnhance.Contrast(img).enhance(factor)
+    # One table lookup per pixel instead of building a gray image and blending.
+    histogram = (img if img.mode == "L" else img.convert("L")).histogram()
+    total = sum(histogram)
+    mean = int(sum(i * count for i, count in enumerate(histogram)) / total + 0.5)
+    return img.point(_contrast_lut(mean, factor) * len(img.getbands()))
+
+
+_LOSSY_FORMATS = {"JPEG", "WEBP"}
 
 
-def image_to_bytes(img, format_hint="PNG"):
+def image_to_bytes(img, format_hint="PNG", quality=90):
+    save_format = format_hint.upper()
+    if save_format == "JPG":
+        save_format = "JPEG"
+    save_kwargs = {"quality": int(quality)} if save_format in _LOSSY_FORMATS else {}
     buf = BytesIO()
-    img.save(buf, format=format_hint)
+    img.save(buf, format=save_format, **save_kwargs)
     data = buf.getvalue()
     mime_type = {
         "JPEG": "image/jpeg",
@@ -70,23 +156,26 @@ def preprocess_image_with_metadata(
     margins=(0, 0, 0, 0),
     contrast_factor=1.0,
     output_format="PNG",
+    quality=90,
 ):
     path = Path(path)
     with Image.open(path) as source:
         original_format = source.format
         original_mode = source.mode
         original_size = source.size
+        draft_for_max_dim(source, max_dim=max_dim)
         img = source.convert("RGB")
 
-    img = resize_image(img, max_dim=max_dim)
-    resized_size = img.size
-
     left, top, right, bottom = margins
-    img = crop_margins(img, left=left, top=top, right=right, bottom=bottom)
+    img, resized_size = resize_and_crop(img, max_dim=max_dim, margins=margins)
     cropped_size = img.size
 
     img = enhance_contrast(img, factor=contrast_factor)
-    image_bytes, mime_type = image_to_bytes(img, format_hint=output_format)
+    image_bytes, mime_type = image_to_bytes(
+        img,
+        format_hint=output_format,
+        quality=quality,
+    )
     metadata = {
         "source_path": str(path),
         "source_bytes": path.stat().st_size if path.exists() else None,
@@ -113,12 +202,96 @@ def preprocess_image_with_metadata(
     return image_bytes, mime_type, metadata
 
 
+def _preprocess_cache_key(path, settings):
+    stat = os.stat(path)
+    raw = json.dumps(
+        [os.path.abspath(path), stat.st_mtime_ns, stat.st_size, settings],
+        sort_keys=True,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _write_cache_file(path, data):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _prune_preprocess_cache(cache_root, max_bytes):
+    # Hits refresh an entry's mtime, so the oldest mtimes are the least
+    # recently used entries; drop those until the page bytes fit max_bytes.
+    entries = []
+    total = 0
+    with os.scandir(cache_root) as it:
+        for entry in it:
+            if not entry.name.endswith(".bin"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            total += stat.st_size
+            entries.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+    if total <= max_bytes:
+        return
+    entries.sort()
+    for _mtime_ns, size, data_path in entries:
+        if total <= max_bytes:
+            break
+        for stale in (data_path.with_suffix(".json"), data_path):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+        total -= size
+
+
+def cached_preprocess_image_with_metadata(path, cache_dir=None, cache_max_bytes=0, **kwargs):
+    """preprocess_image_with_metadata backed by an on-disk cache in cache_dir.
+
+    Entries are keyed on the source path, its mtime/size and the preprocess
+    settings, so edited sources or changed settings miss the cache. With
+    cache_max_bytes > 0, least recently used entries are evicted after each
+    write to keep the cached page bytes under that size.
+    """
+    if not cache_dir:
+        return preprocess_image_with_metadata(path, **kwargs)
+    cache_root = Path(cache_dir).expanduser()
+    key = _preprocess_cache_key(path, kwargs)
+    data_path = cache_root / f"{key}.bin"
+    meta_path = cache_root / f"{key}.json"
+    try:
+        metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+        image_bytes = data_path.read_bytes()
+        if len(image_bytes) == metadata["output_bytes"]:
+            if cache_max_bytes > 0:
+                os.utime(data_path)
+            metadata["cache_hit"] = True
+            return image_bytes, metadata["mime_type"], metadata
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    image_bytes, mime_type, metadata = preprocess_image_with_metadata(path, **kwargs)
+    try:
+        cache_root.mkdir(parents=True, exist_ok=True)
+        # The metadata file is written last and marks the entry as complete.
+        _write_cache_file(data_path, image_bytes)
+        _write_cache_file(meta_path, json.dumps(metadata).encode("utf-8"))
+        if cache_max_bytes > 0:
+            _prune_preprocess_cache(cache_root, cache_max_bytes)
+    except OSError:
+        pass
+    metadata["cache_hit"] = False
+    return image_bytes, mime_type, metadata
+
+
 def preprocess_image(
     path,
     max_dim=3000,
     margins=(0, 0, 0, 0),
     contrast_factor=1.0,
     output_format="PNG",
+    quality=90,
 ):
     image_bytes, mime_type, _metadata = preprocess_image_with_metadata(
         path,
@@ -126,6 +299,7 @@ def preprocess_image(
         margins=margins,
         contrast_factor=contrast_factor,
         output_format=output_format,
+        quality=quality,
     )
     return image_bytes, mime_type
 
@@ -9,6 +9,7 @@ from statistics import mean, median
 from typing import Any, Iterable
 
 from patientjournals.shared.identity import image_name_from_reference
+from patientjournals.shared.tools import _jsonl_line
 
 
 MANIFEST_FILE_NAME = "image_processing_manifest.jsonl"
@@ -22,9 +23,8 @@ def utc_now_iso() -> str:
 def append_processing_record(path: str | Path, record: dict[str, Any]) -> None:
     manifest_path = Path(path)
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(manifest_path, "a", encoding="utf-8") as handle:
-        handle.write(json.dumps(record, ensure_ascii=False, default=str))
-        handle.write("\n")
+    with open(manifest_path, "ab") as handle:
+        handle.write(_jsonl_line(record))
 
 
 def read_processing_records(path: str | Path) -> list[dict[str, Any]]:
@@ -3,7 +3,11 @@ from __future__ import annotations
 import json
 import math
 import re
-from typing import Any
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 
 def _pick_value(obj: object, *names: str) -> object | None:
@@ -52,42 +56,56 @@ def _part_is_thought(part: object) -> bool:
     return bool(value)
 
 
-def extract_response_text(response: object) -> str | None:
-    for candidate in _iter_candidates(response):
+def _split_text_and_thoughts(
+    candidates: list[object],
+) -> tuple[str | None, str | None]:
+    # One walk over candidates/parts yields both the answer text (first
+    # candidate with non-thought text) and all thought text.
+    text: str | None = None
+    thoughts: list[str] = []
+    for candidate in candidates:
         chunks: list[str] = []
         for part in _iter_parts(candidate):
-            text = _part_text(part)
-            if text and not _part_is_thought(part):
-                chunks.append(text)
+            part_text = _part_text(part)
+            if not part_text:
+                continue
+            if _part_is_thought(part):
+                thoughts.append(part_text)
+            elif text is None:
+                chunks.append(part_text)
         if chunks:
-            return "".join(chunks)
+            text = "".join(chunks)
+    return text, ("\n\n".join(thoughts) if thoughts else None)
+
 
+def _top_level_text(response: object) -> str | None:
     top_text = _pick_value(response, "text")
     if isinstance(top_text, str) and top_text.strip():
         return top_text.strip()
     return None
 
 
+def extract_response_text(response: object) -> str | None:
+    text, _thoughts = _split_text_and_thoughts(_iter_candidates(response))
+    return text if text is not None else _top_level_text(response)
+
+
 def extract_response_thoughts(response: object) -> str | None:
-    thoughts: list[str] = []
-    for candidate in _iter_candidates(response):
-        for part in _iter_parts(candidate):
-            text = _part_text(part)
-            if text and _part_is_thought(part):
-                thoughts.append(text)
-    if not thoughts:
-        return None
-    return "\n\n".join(thoughts)
+    _text, thoughts = _split_text_and_thoughts(_iter_candidates(response))
+    return thoughts
 
 
-def extract_response_avg_logprobs(response: object) -> float | None:
-    candidate = _first_candidate(response)
+def _candidate_avg_logprobs(candidate: object | None) -> float | None:
     value = _pick_value(candidate, "avg_logprobs", "avgLogprobs")
     if isinstance(value, (int, float)):
         return float(value)
     return None
 
 
+def extract_response_avg_logprobs(response: object) -> float | None:
+    return _candidate_avg_logprobs(_first_candidate(response))
+
+
 def _chosen_token_logprobs(candidate: object | None) -> list[tuple[str, float]]:
     if candidate is None:
         return []
@@ -339,22 +357,24 @@ def confidence_from_avg_logprobs(avg_logprobs: float | None) -> float | None:
     return confidence
 
 
-def extract_field_confidence_by_pointer(
-    response: object,
-    payload_text: str | None = None,
+def _field_confidence_by_pointer(
+    text: str | None,
+    candidate: object | None,
 ) -> dict[str, dict[str, float | None]]:
-    text = payload_text if isinstance(payload_text, str) else extract_response_text(response)
     if not isinstance(text, str) or not text.strip():
         return {}
 
+    # Without token logprobs (confidence scores disabled) there is nothing to
+    # attribute, so skip scanning the payload for leaf spans.
+    token_logprobs = _chosen_token_logprobs(candidate)
+    if not token_logprobs:
+        return {}
+
     try:
         leaf_spans = _collect_leaf_value_spans(text)
     except ValueError:
         return {}
 
-    token_logprobs = _chosen_token_logprobs(_first_candidate(response))
-    if not token_logprobs:
-        return {}
     by_pointer_logprobs = _collect_logprobs_by_pointer(
         payload_text=text,
         token_logprobs=token_logprobs,
@@ -377,14 +397,40 @@ def extract_field_confidence_by_pointer(
     return out
 
 
+def extract_field_confidence_by_pointer(
+    response: object,
+    payload_text: str | None = None,
+) -> dict[str, dict[str, float | None]]:
+    text = payload_text if isinstance(payload_text, str) else extract_response_text(response)
+    return _field_confidence_by_pointer(text, _first_candidate(response))
+
+
 def extract_response_metadata(response: object) -> dict[str, Any]:
-    text = extract_response_text(response)
+    candidates = _iter_candidates(response)
+    first_candidate = candidates[0] if candidates else None
+    text, thoughts = _split_text_and_thoughts(candidates)
+    if text is None:
+        text = _top_level_text(response)
     return {
         "text": text,
-        "thoughts": extract_response_thoughts(response),
-        "avg_logprobs": extract_response_avg_logprobs(response),
-        "field_confidence_by_pointer": extract_field_confidence_by_pointer(
-            response=response,
-            payload_text=text,
+        "thoughts": thoughts,
+        "avg_logprobs": _candidate_avg_logprobs(first_candidate),
+        "field_confidence_by_pointer": _field_confidence_by_pointer(
+            text,
+            first_candidate,
         ),
     }
+
+
+def parse_output_json(model: type[ModelT], payload: str | bytes) -> ModelT:
+    # Same result as model.model_validate_json, minus the Python-level wrapper.
+    return model.__pydantic_validator__.validate_json(payload)
+
+
+def parse_output(model: type[ModelT], text: str, parsed: object = None) -> ModelT:
+    # With a dict response_json_schema the google-genai SDK has already run
+    # json.loads on the response text into ``parsed``; validate that instead of
+    # parsing the text a second time.
+    if isinstance(parsed, dict):
+        return model.__pydantic_validator__.validate_python(parsed)
+    return parse_output_json(model, text)
@@ -17,6 +17,7 @@ backward compatibility, so the two layouts can coexist during migration.
 from __future__ import annotations
 
 import json
+import os
 import re
 import shutil
 from pathlib import Path
@@ -57,21 +58,68 @@ def _sorted_by_recency(dirs: list[Path]) -> list[Path]:
     return sorted(dirs, key=sort_key, reverse=True)
 
 
-def iter_run_dirs(root: str | Path, category: str) -> list[Path]:
-    """Run directories for a category: new subfolder plus legacy flat dirs."""
+def _scan_dirs(path: Path, prefix: str = "") -> list[os.DirEntry]:
+    # DirEntry.is_dir() reuses the file type from the directory listing, so
+    # this costs no extra stat per entry.
+    try:
+        with os.scandir(path) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.name.startswith(prefix) and entry.is_dir()
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def _category_entries(root: str | Path, category: str) -> list[os.DirEntry]:
     root_path = Path(root).expanduser()
-    dirs: list[Path] = []
-    sub = root_path / CATEGORY_DIRS[category]
-    if sub.is_dir():
-        dirs.extend(item for item in sub.iterdir() if item.is_dir())
+    entries = _scan_dirs(root_path / CATEGORY_DIRS[category])
     prefix = LEGACY_PREFIXES.get(category)
-    if prefix and root_path.is_dir():
-        dirs.extend(
-            item
-            for item in root_path.iterdir()
-            if item.is_dir() and item.name.startswith(prefix)
-        )
-    return _sorted_by_recency(dirs)
+    if prefix:
+        entries.extend(_scan_dirs(root_path, prefix))
+    return entries
+
+
+def _entry_mtime(entry: os.DirEntry) -> float:
+    try:
+        return entry.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def iter_run_dirs(root: str | Path, category: str) -> list[Path]:
+    """Run directories for a category: new subfolder plus legacy flat dirs."""
+    entries = sorted(_category_entries(root, category), key=_entry_mtime, reverse=True)
+    return [Path(entry.path) for entry in entries]
+
+
+def latest_run_dir(root: str | Path, category: str) -> Path | None:
+    """Most recently modified run directory for a category, or None."""
+    latest = max(_category_entries(root, category), key=_entry_mtime, default=None)
+    return Path(latest.path) if latest is not None else None
+
+
+def read_batch_job_payload(path: Path) -> dict | None:
+    """Parsed ``batch_job.json`` payload, or None if missing or malformed."""
+    if not path.exists() or not path.is_file():
+        return None
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    if isinstance(payload, dict):
+        return payload
+    return None
+
+
+def latest_batch_job_file(root: str | Path) -> Path | None:
+    """``batch_job.json`` of the most recent submit run that has one."""
+    for run_dir in iter_run_dirs(root, "submit"):
+        candidate = run_dir / "batch_job.json"
+        if candidate.exists() and candidate.is_file():
+            return candidate
+    return None
 
 
 def iter_all_run_dirs(root: str | Path) -> list[Path]:
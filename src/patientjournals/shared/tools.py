@@ -1,22 +1,32 @@
 from __future__ import annotations
 
 import csv
+import fnmatch
+import os
+import re
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import json
 import shutil
-import types
+import threading
+import time
 import traceback
-from dataclasses import asdict, is_dataclass
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+import pydantic_core
 from pydantic import BaseModel
 
 import patientjournals.config.settings as config_module
 from patientjournals.config import config
 from patientjournals.shared import run_layout
 from patientjournals.shared.identity import (
+    IDENTITY_SOURCE_COLUMNS,
     build_image_name_set,
     ensure_row_image_name,
+    image_name_from_reference,
     row_image_name,
 )
 from patientjournals.shared.output_handler import data_to_rows as schema_data_to_rows
@@ -51,14 +61,151 @@ def data_to_row(
         )
     return rows[0]
 
+@lru_cache(maxsize=16)
 def _normalize_output_format(output_format: str) -> str:
     fmt = output_format.strip().lower().lstrip(".")
     if fmt not in {"csv", "jsonl"}:
         raise ValueError(f"Unsupported output_format: {output_format}")
     return fmt
 
-def _rows_to_flat_dataframe(rows: list[dict]) -> pd.DataFrame:
-    return pd.json_normalize(rows, sep=".")
+def _flatten_row(row: dict, prefix: str = "", out: dict | None = None) -> dict:
+    flat = {} if out is None else out
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            _flatten_row(value, f"{name}.", flat)
+        else:
+            flat[name] = value
+    return flat
+
+def _flat_columns(rows: list[dict]) -> list[str]:
+    # Same order as pd.json_normalize: a row's top-level values first, then its
+    # nested fields.
+    columns: dict[str, None] = {}
+    for row in rows:
+        columns.update(
+            dict.fromkeys(key for key, value in row.items() if not isinstance(value, dict))
+        )
+        columns.update(
+            dict.fromkeys(
+                _flatten_row({k: v for k, v in row.items() if isinstance(v, dict)})
+            )
+        )
+    return list(columns)
+
+def _read_csv_header(path: Path, sep: str) -> list[str]:
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        reader = csv.reader(handle, delimiter=sep)
+        return next(reader, [])
+
+def _existing_csv_header(path: Path, sep: str) -> list[str]:
+    # A non-empty file already starts with its header, whatever the caller
+    # tracked; an empty or missing one still needs it.
+    try:
+        if os.path.getsize(path) == 0:
+            return []
+    except OSError:
+        return []
+    return _read_csv_header(path, sep)
+
+def _identity_usecols(path: Path, sep: str) -> list[str] | None:
+    # Coverage only needs the identity columns; the first column is kept when
+    # none are present so pandas still counts the rows.
+    header = _read_csv_header(path, sep)
+    columns = [column for column in header if column in IDENTITY_SOURCE_COLUMNS]
+    return columns or header[:1] or None
+
+# An image_name with no slash and no surrounding whitespace is already its
+# own identity, so image_name_from_reference() would return it unchanged.
+_BARE_IMAGE_NAME = r"[^/\s](?:[^/]*[^/\s])?"
+
+def _csv_row_image_names(df: pd.DataFrame) -> pd.Series:
+    names = pd.Series([None] * len(df), index=df.index, dtype=object)
+    pending = pd.Series(True, index=df.index)
+    direct = df["image_name"] if "image_name" in df.columns else None
+    if direct is not None and (
+        pd.api.types.is_string_dtype(direct) or pd.api.types.is_object_dtype(direct)
+    ):
+        bare = direct.str.fullmatch(_BARE_IMAGE_NAME).fillna(False).astype(bool)
+        names[bare] = direct[bare]
+        pending = ~bare
+    columns = [column for column in IDENTITY_SOURCE_COLUMNS if column in df.columns]
+    if columns and pending.any():
+        names[pending] = [
+            row_image_name(row)
+            for row in df.loc[pending, columns].to_dict("records")
+        ]
+    return names
+
+def _filter_csv_by_image_names(
+    df: pd.DataFrame,
+    image_names: set[str] | None,
+) -> pd.DataFrame:
+    names = _csv_row_image_names(df)
+    if image_names is not None:
+        keep = names.isin(image_names)
+        df = df[keep]
+        names = names[keep]
+    if len(df) and "image_name" not in df.columns:
+        df.insert(0, "image_name", names.tolist())
+    elif len(df):
+        df["image_name"] = [
+            value or name
+            for value, name in zip(df["image_name"].tolist(), names.tolist())
+        ]
+    return df
+
+def _csv_cell(value: object) -> object:
+    return "" if isinstance(value, float) and value != value else value
+
+def _write_csv_rows(
+    handle,
+    rows: list[dict],
+    columns: list[str],
+    *,
+    write_header: bool,
+    sep: str,
+) -> None:
+    # LF endings and empty NaN cells, as DataFrame.to_csv wrote them.
+    writer = csv.writer(handle, delimiter=sep, lineterminator="\n")
+    if write_header:
+        writer.writerow(columns)
+    writer.writerows(
+        tuple(_csv_cell(flat.get(column, "")) for column in columns)
+        for flat in map(_flatten_row, rows)
+    )
+
+def _jsonl_line(row: dict) -> bytes:
+    # pydantic-core's Rust encoder is always installed and several times faster
+    # than json.dumps for these nested row dicts. Both write NaN/Infinity as
+    # bare tokens, which json.loads reads back.
+    try:
+        return pydantic_core.to_json(row, fallback=str) + b"\n"
+    except (TypeError, ValueError):
+        pass
+    return (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+def _json_loads(raw: bytes) -> object:
+    """Decode one JSONL line; raises ValueError for malformed input."""
+    return json.loads(raw)
+
+# Every string literal of a JSONL line that holds no escapes.
+_JSON_STRING = re.compile(rb'"([^"\\]*)"')
+
+def _jsonl_may_name(raw: bytes, image_names: set[str]) -> bool:
+    """False only when none of the line's strings names one of image_names."""
+    # A row's image name comes from one of its string values; lines with
+    # escapes are left to the decoder.
+    if b"\\" in raw:
+        return True
+    for token in _JSON_STRING.findall(raw):
+        try:
+            name = image_name_from_reference(token.decode("utf-8"))
+        except UnicodeDecodeError:
+            return True
+        if name in image_names:
+            return True
+    return False
 
 def flush_rows(
     rows: list[dict],
@@ -69,36 +216,107 @@ def flush_rows(
 ) -> bool:
     fmt = _normalize_output_format(output_format)
     if fmt == "csv":
-        frame = _rows_to_flat_dataframe(rows)
         path = Path(out_path)
-        if header_written and path.exists():
-            with open(path, "r", encoding="utf-8", newline="") as handle:
-                reader = csv.reader(handle, delimiter=sep)
-                existing_header = next(reader, [])
-            if existing_header:
-                frame = frame.reindex(columns=existing_header)
-        frame.to_csv(
-            out_path,
-            mode="a",
-            index=False,
-            header=not header_written,
-            sep=sep,
-        )
+        columns = _existing_csv_header(path, sep)
+        with open(path, "a", encoding="utf-8", newline="") as handle:
+            _write_csv_rows(
+                handle,
+                rows,
+                columns or _flat_columns(rows),
+                write_header=not columns,
+                sep=sep,
+            )
         return True
 
-    with open(out_path, "a", encoding="utf-8") as handle:
-        for row in rows:
-            handle.write(json.dumps(row, ensure_ascii=False, default=str))
-            handle.write("\n")
+    with open(out_path, "ab") as handle:
+        handle.writelines(_jsonl_line(row) for row in rows)
     return header_written
 
+
+class DatasetWriter:
+    """Append dataset rows through one long-lived, buffered file handle.
+
+    ``flush_rows`` reopens the output (and re-reads the CSV header) on every
+    call; long runs that emit rows one image at a time should keep a writer
+    open instead and close it before the file is moved or uploaded.
+    """
+
+    def __init__(
+        self,
+        out_path: str | Path,
+        output_format: str,
+        *,
+        header_written: bool = False,
+        sep: str = "$",
+        buffering: int = 1 << 20,
+    ) -> None:
+        self.out_path = Path(out_path)
+        self.output_format = _normalize_output_format(output_format)
+        self.header_written = header_written
+        self.sep = sep
+        self.buffering = buffering
+        self.rows_written = 0
+        self._handle = None
+        self._columns: list[str] | None = None
+
+    def _open(self):
+        if self._handle is None:
+            if self.output_format == "csv":
+                self._handle = open(
+                    self.out_path,
+                    "a",
+                    encoding="utf-8",
+                    newline="",
+                    buffering=self.buffering,
+                )
+            else:
+                self._handle = open(self.out_path, "ab", buffering=self.buffering)
+        return self._handle
+
+    def write_rows(self, rows: list[dict]) -> int:
+        if not rows:
+            return 0
+        if self.output_format == "csv":
+            if self._columns is None:
+                existing = _existing_csv_header(self.out_path, self.sep)
+                self.header_written = bool(existing)
+                self._columns = existing or _flat_columns(rows)
+            _write_csv_rows(
+                self._open(),
+                rows,
+                self._columns,
+                write_header=not self.header_written,
+                sep=self.sep,
+            )
+            self.header_written = True
+        else:
+            self._open().writelines(_jsonl_line(row) for row in rows)
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
 def create_subfolder(
     root: str | Path = "runs",
     prefix: str = "",
     category: str = "",
 ) -> Path:
     root_path = Path(root)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
 
     # Resolve the job category so the run lands in the right subfolder. A bare
     # prefix (legacy callers) is mapped to its category for the same effect.
@@ -120,21 +338,22 @@ def create_subfolder(
     run_dir = parent / run_name
     run_dir.mkdir(parents=True, exist_ok=False)
 
-    raw_config = Path(config_module.__file__).read_text(encoding="utf-8")
-    (run_dir / "config_snapshot.py").write_text(raw_config, encoding="utf-8")
+    shutil.copyfile(config_module.__file__, run_dir / "config_snapshot.py")
 
-    def serializable_config(module: types.ModuleType) -> dict:
-        out: dict[str, object] = {}
-        cfg = getattr(module, "config", None)
-        if cfg is not None and is_dataclass(cfg):
-            out["config"] = asdict(cfg)
-        return out
+    # Field values are only serialized, so asdict()'s deep copy of the schema
+    # and prompt dicts is skipped.
+    cfg = getattr(config_module, "config", None)
+    config_values: dict[str, object] = {}
+    if cfg is not None and is_dataclass(cfg):
+        config_values["config"] = {
+            item.name: getattr(cfg, item.name) for item in fields(cfg)
+        }
 
     payload = {
-        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "created_at": now.isoformat(timespec="seconds"),
         "kind": kind,
         "config_file": "config_snapshot.py",
-        "config_values": serializable_config(config_module),
+        "config_values": config_values,
         "output_schema": config.output_schema,
     }
     (run_dir / "metadata.json").write_text(
@@ -152,18 +371,110 @@ def _cfg_get(cfg_obj: object, key: str, default: object | None = None):
     return default
 
 
-def _is_fp_file(path: Path, root: Path, fp_suffix: str) -> bool:
-    try:
-        rel = path.relative_to(root)
-    except ValueError:
-        rel = path
-    folder_parts = rel.parts[:-1]
+def _is_fp_file(path: str, root: str, fp_suffix: str) -> bool:
+    prefix = root.rstrip(os.sep) + os.sep
+    rel = path[len(prefix):] if path.startswith(prefix) else path
+    folder_parts = rel.split(os.sep)[:-1]
     return any(part.endswith(fp_suffix) for part in folder_parts)
 
 
-def _gather_files(root: Path, pattern: str, recursive: bool) -> list[Path]:
-    paths = root.rglob(pattern) if recursive else root.glob(pattern)
-    return [p for p in paths if p.is_file()]
+def _path_sort_key(path: str) -> list[str]:
+    # Same ordering as sorting Path objects (component-wise, normcased).
+    return os.path.normcase(path).split(os.sep)
+
+
+_SCAN_WORKERS = 8
+
+
+def _scan_dir(
+    current: str,
+    matches,
+    found: list[str],
+    subdirs: list[str] | None,
+    prune_suffix: str | None = None,
+) -> None:
+    try:
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if subdirs is not None and entry.is_dir(follow_symlinks=False):
+                    if prune_suffix is None or not entry.name.endswith(prune_suffix):
+                        subdirs.append(entry.path)
+                elif matches(os.path.normcase(entry.name)) and entry.is_file():
+                    found.append(entry.path)
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        pass
+
+
+def _scan_tree(
+    root: str,
+    matches,
+    prune_suffix: str | None = None,
+    dirs: list[str] | None = None,
+) -> list[str]:
+    found: list[str] = []
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        if dirs is not None:
+            dirs.append(current)
+        _scan_dir(current, matches, found, stack, prune_suffix)
+    return found
+
+
+def _scan_files(
+    root: str,
+    matches,
+    recursive: bool,
+    prune_suffix: str | None = None,
+    dirs: list[str] | None = None,
+) -> list[str]:
+    # os.scandir hands back cached file types, so no Path object or extra stat
+    # per entry; symlinked directories are not descended into (like rglob).
+    # Subfolders named with prune_suffix are skipped whole. Every scanned
+    # directory is appended to dirs when it is given.
+    found: list[str] = []
+    subdirs: list[str] | None = [] if recursive else None
+    if dirs is not None:
+        dirs.append(root)
+    _scan_dir(root, matches, found, subdirs, prune_suffix)
+    if not subdirs:
+        return found
+    if len(subdirs) == 1:
+        return found + _scan_tree(subdirs[0], matches, prune_suffix, dirs)
+    # Top-level folders are walked in threads so per-entry latency on network
+    # filesystems overlaps; scandir releases the GIL while it waits.
+    with ThreadPoolExecutor(max_workers=min(_SCAN_WORKERS, len(subdirs))) as pool:
+        subtrees = pool.map(
+            lambda subdir: _scan_tree(subdir, matches, prune_suffix, dirs), subdirs
+        )
+        for subtree in subtrees:
+            found.extend(subtree)
+    return found
+
+def _glob_match(pattern: str):
+    # fnmatch.fnmatch, compiled once; callers pass os.path.normcase(name).
+    return re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+
+def _is_pdf_name(name: str) -> bool:
+    # Path(name).suffix.lower() == ".pdf"; a bare ".pdf" has no suffix.
+    return len(name) > 4 and name.lower().endswith(".pdf")
+
+def _scan_pdf_paths(folder: Path, recursive: bool) -> list[Path]:
+    # Sorted like sorted() over Path objects, but compared as strings.
+    found = _scan_files(str(folder), _is_pdf_name, recursive)
+    found.sort(key=_path_sort_key)
+    return [Path(path) for path in found]
+
+def _gather_files(
+    root: Path,
+    pattern: str,
+    recursive: bool,
+    prune_suffix: str | None = None,
+) -> list[str]:
+    if "/" in pattern or os.sep in pattern or "**" in pattern:
+        paths = root.rglob(pattern) if recursive else root.glob(pattern)
+        return [str(p) for p in paths if p.is_file()]
+    return _scan_files(str(root), _glob_match(pattern), recursive, prune_suffix)
 
 
 def list_input_files(cfg_obj: object) -> list[str]:
@@ -186,21 +497,25 @@ def list_input_files(cfg_obj: object) -> list[str]:
             f"Expected one of: {sorted(allowed_fp_modes)}"
         )
 
-    files = _gather_files(folder, pattern, recursive)
+    # In exclude_fp mode no file under an _fp folder survives the filter
+    # below, so those folders are not walked at all.
+    prune_suffix = fp_suffix if fp_mode == "exclude_fp" else None
+    files = _gather_files(folder, pattern, recursive, prune_suffix)
+    root = str(folder)
     if fp_mode == "only_fp":
-        files = [p for p in files if _is_fp_file(p, folder, fp_suffix)]
+        files = [p for p in files if _is_fp_file(p, root, fp_suffix)]
     elif fp_mode == "exclude_fp":
-        files = [p for p in files if not _is_fp_file(p, folder, fp_suffix)]
+        files = [p for p in files if not _is_fp_file(p, root, fp_suffix)]
 
     if fp_mode == "exclude_fp":
-        leaked = [p for p in files if _is_fp_file(p, folder, fp_suffix)]
+        leaked = [p for p in files if _is_fp_file(p, root, fp_suffix)]
         if leaked:
             raise RuntimeError(
                 "Internal selection error: _fp files leaked in exclude_fp mode. "
                 f"Example: {leaked[0]}"
             )
 
-    files = sorted(files)
+    files.sort(key=_path_sort_key)
     if not files:
         raise FileNotFoundError(
             "No files matched selection "
@@ -208,29 +523,50 @@ def list_input_files(cfg_obj: object) -> list[str]:
             f"in {folder} (recursive={recursive})"
         )
 
-    return [str(p) for p in files]
+    return files
 
 def normalize_path(path: str | Path) -> str:
-    return str(Path(path).expanduser().resolve())
-
-def _candidate_path_ids(path: str | Path, target_folder: str | Path | None) -> set[str]:
-    p = Path(path)
-    ids = {normalize_path(p)}
-    if not p.is_absolute() and target_folder is not None:
-        base = Path(target_folder)
-        rel_parts = base.parts
-        p_parts = p.parts
-        if not (rel_parts and list(p_parts[:len(rel_parts)]) == list(rel_parts)):
-            ids.add(normalize_path(base / p))
-    return ids
+    # Path.resolve() is os.path.realpath underneath; skip the Path objects.
+    # Only a "~" needs Path's own normalization first ("./~" expands too).
+    path = os.fspath(path)
+    if "~" in path:
+        path = str(Path(path))
+    return os.path.realpath(os.path.expanduser(path))
+
+def _relative_parts(path: str) -> tuple[str, ...]:
+    # The components Path(path).parts yields for a relative path.
+    if os.altsep:
+        path = path.replace(os.altsep, os.sep)
+    return tuple(part for part in path.split(os.sep) if part and part != ".")
+
+def _target_base_parts(base: str) -> tuple[str, ...]:
+    return () if os.path.isabs(base) else _relative_parts(base)
 
 def build_path_id_set(
     paths: list[str],
     target_folder: str | Path | None = None,
 ) -> set[str]:
+    # The target folder is normalized and split once rather than per path,
+    # and ids are added straight into one set.
+    base = str(Path(target_folder)) if target_folder is not None else None
+    base_parts = _target_base_parts(base) if base is not None else ()
     ids: set[str] = set()
+    add = ids.add
     for p in paths:
-        ids.update(_candidate_path_ids(p, target_folder))
+        path_str = os.fspath(p)
+        add(normalize_path(path_str))
+        if base is None or os.path.isabs(path_str):
+            continue
+        parts = _relative_parts(path_str)
+        # Relative paths already under a relative target folder are not
+        # re-rooted; an absolute folder can never prefix a relative path.
+        if base_parts and parts[:len(base_parts)] == base_parts:
+            continue
+        if base == ".":
+            joined = os.path.join(*parts) if parts else "."
+        else:
+            joined = os.path.join(base, *parts)
+        add(normalize_path(joined))
     return ids
 
 
@@ -253,47 +589,28 @@ def filter_dataset_by_image_names(
     kept = 0
 
     if fmt == "jsonl":
-        with open(src, "r", encoding="utf-8") as src_handle, open(dest, "w", encoding="utf-8") as dst_handle:
+        with open(src, "rb") as src_handle, open(dest, "wb") as dst_handle:
             for line in src_handle:
                 raw = line.strip()
                 if not raw:
                     continue
+                # Rows that cannot be selected are skipped undecoded.
+                if not _jsonl_may_name(raw, image_names):
+                    continue
                 try:
-                    payload = json.loads(raw)
-                except json.JSONDecodeError:
+                    payload = _json_loads(raw)
+                except ValueError:
                     continue
                 if not isinstance(payload, dict):
                     continue
                 image_name = ensure_row_image_name(payload)
                 if image_name not in image_names:
                     continue
-                dst_handle.write(
-                    json.dumps(payload, ensure_ascii=False, default=str)
-                )
-                dst_handle.write("\n")
+                dst_handle.write(_jsonl_line(payload))
                 kept += 1
         return kept
 
-    df = pd.read_csv(src, sep=csv_sep)
-    if image_names:
-        mask = df.apply(
-            lambda row: row_image_name(row.to_dict()) in image_names,
-            axis=1,
-        )
-        df = df[mask]
-    else:
-        df = df.iloc[0:0]
-    if len(df) and "image_name" not in df.columns:
-        df.insert(
-            0,
-            "image_name",
-            [row_image_name(row) for row in df.to_dict("records")],
-        )
-    elif len(df):
-        df["image_name"] = [
-            row.get("image_name") or row_image_name(row)
-            for row in df.to_dict("records")
-        ]
+    df = _filter_csv_by_image_names(pd.read_csv(src, sep=csv_sep), image_names or set())
     kept = len(df)
     df.to_csv(dest, index=False, sep=csv_sep)
     return kept
@@ -353,14 +670,14 @@ def load_existing_dataset(
     row_count = 0
 
     if fmt == "jsonl":
-        with open(path, "r", encoding="utf-8") as handle:
+        with open(path, "rb") as handle:
             for line in handle:
                 line = line.strip()
                 if not line:
                     continue
                 try:
-                    payload = json.loads(line)
-                except json.JSONDecodeError:
+                    payload = _json_loads(line)
+                except ValueError:
                     continue
                 if isinstance(payload, dict):
                     image_name = row_image_name(payload)
@@ -368,12 +685,9 @@ def load_existing_dataset(
                         image_names.add(image_name)
                 row_count += 1
     else:
-        df = pd.read_csv(path, sep=csv_sep)
+        df = pd.read_csv(path, sep=csv_sep, usecols=_identity_usecols(path, csv_sep))
         row_count = len(df)
-        for row in df.to_dict("records"):
-            image_name = row_image_name(row)
-            if image_name:
-                image_names.add(image_name)
+        image_names.update(filter(None, _csv_row_image_names(df)))
 
     return fmt, image_names, row_count
 
@@ -387,7 +701,7 @@ def write_run_error(run_dir: str | Path, exc: BaseException) -> Path:
     run_path = Path(run_dir)
     run_path.mkdir(parents=True, exist_ok=True)
 
-    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stamp = time.strftime("%Y%m%d_%H%M%S")
     err_path = run_path / f"error_{stamp}.txt"
 
     msg = "".join(
@@ -396,18 +710,35 @@ def write_run_error(run_dir: str | Path, exc: BaseException) -> Path:
     err_path.write_text(msg, encoding="utf-8")
     return err_path
 
+def _close_logger_handle(state: dict[str, object]) -> None:
+    handle = state.get("handle")
+    if handle is not None:
+        handle.close()
+
 def get_run_logger(run_dir: str | Path, log_name: str = "run.log"):
     log_path = Path(run_dir) / log_name
+    # One append handle per logger, flushed per line so the log can be tailed;
+    # the timestamp is formatted once per second rather than per message.
+    state: dict[str, object] = {"handle": None, "second": None, "stamp": ""}
+    lock = threading.Lock()
 
     def log(message: str, exc: BaseException | None = None) -> None:
-        stamp = datetime.now().isoformat(timespec="seconds")
-        line = f"[{stamp}] {message}"
+        now = int(time.time())
+        if now != state["second"]:
+            state["second"] = now
+            state["stamp"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now))
+        line = f"[{state['stamp']}] {message}"
         if exc is not None:
             detail = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
             line = f"{line}\n{detail}"
-        with open(log_path, "a", encoding="utf-8") as handle:
+        if not line.endswith("\n"):
+            line += "\n"
+        with lock:
+            handle = state["handle"]
+            if handle is None or handle.closed:
+                handle = state["handle"] = open(log_path, "a", encoding="utf-8")
             handle.write(line)
-            if not line.endswith("\n"):
-                handle.write("\n")
+            handle.flush()
 
+    weakref.finalize(log, _close_logger_handle, state)
     return log
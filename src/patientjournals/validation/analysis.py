@@ -1,7 +1,16 @@
 import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+import matplotlib
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Reports are only written to PNG; skip GUI backend detection.
+matplotlib.use("Agg")
+
 import seaborn as sns
 import matplotlib.pyplot as plt
 
@@ -21,6 +30,44 @@ LABEL_SCORES = {
     "unsure": 0.0,
     "corrected": 0.0,
 }
+# Nested plots only go to worker processes when each gets at least this many,
+# so interpreter start-up in the workers pays for itself.
+_PLOTS_PER_WORKER = 4
+_VALIDATION_COLUMNS = frozenset({"label", "column_name"})
+# Scores indexed by the label's category code in load_validations.
+_SCORE_BY_CODE = pd.Series(
+    [LABEL_SCORES[label] for label in LABEL_ORDER], dtype="float64"
+).to_numpy()
+
+
+def _read_validation_csv(path: Path) -> pd.DataFrame:
+    # Only label and column_name feed the plots; skip parsing the rest. Both
+    # repeat a few distinct strings on every row, so each shard is held as
+    # category codes rather than one Python string per cell.
+    return pd.read_csv(path, usecols=_VALIDATION_COLUMNS.__contains__, dtype="category")
+
+
+def _str_categorical(frame: pd.DataFrame, column: str) -> pd.Categorical:
+    if column not in frame.columns:
+        empty = pd.Index([], dtype=str)
+        return pd.Categorical.from_codes([-1] * len(frame), categories=empty)
+    values = frame[column].array
+    # An empty shard parses with object categories; union needs one dtype.
+    return pd.Categorical.from_codes(values.codes, categories=values.categories.astype(str))
+
+
+def _concat_validation_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # pd.concat falls back to plain strings when shard categories differ;
+    # union_categoricals merges the codes without expanding them.
+    columns = dict.fromkeys(column for frame in frames for column in frame.columns)
+    return pd.DataFrame(
+        {
+            column: union_categoricals(
+                [_str_categorical(frame, column) for frame in frames]
+            )
+            for column in columns
+        }
+    )
 
 
 def load_validations(path: Path) -> pd.DataFrame:
@@ -30,9 +77,20 @@ def load_validations(path: Path) -> pd.DataFrame:
         files = [path]
     if not files:
         raise FileNotFoundError(f"No validation files found at {path}")
-    frames = [pd.read_csv(f) for f in files]
-    df = pd.concat(frames, ignore_index=True)
-    df["label"] = df["label"].astype(str).str.lower()
+    if len(files) == 1:
+        frames = [_read_validation_csv(files[0])]
+    else:
+        # The CSV tokenizer releases the GIL, so shards parse in parallel.
+        workers = min(len(files), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_read_validation_csv, files))
+    df = _concat_validation_frames(frames)
+    raw_labels = df["label"]
+    labels = raw_labels.map({label: label.lower() for label in raw_labels.cat.categories})
+    # Labels outside LABEL_ORDER become missing (code -1) and are never scored.
+    df["label"] = pd.Categorical(
+        labels.where(labels.isin(LABEL_ORDER)), categories=LABEL_ORDER
+    )
     if "column_name" not in df.columns:
         raise ValueError("Missing column_name in validation data.")
     return df
@@ -45,16 +103,14 @@ def save_plot(fig, out_dir: Path, name: str) -> None:
 
 
 def plot_label_distribution(df: pd.DataFrame, out_dir: Path) -> None:
-    counts = (
-        df["label"]
-        .value_counts()
-        .reindex(LABEL_ORDER, fill_value=0)
-        .rename_axis("label")
-        .reset_index(name="count")
+    # Counted on the category codes, in LABEL_ORDER, with zeros for unused labels.
+    counts = pd.DataFrame(
+        {
+            "label": [LABEL_DISPLAY[label] for label in LABEL_ORDER],
+            "count": df["label"].value_counts(sort=False).to_numpy(),
+        }
     )
-    counts["label"] = counts["label"].map(LABEL_DISPLAY).fillna(counts["label"])
 
-    sns.set_theme(style="whitegrid")
     fig, ax = plt.subplots(figsize=(7, 4))
     sns.barplot(data=counts, x="label", y="count", hue="label", ax=ax, palette="viridis", legend=False)
     ax.set_title("Label Distribution")
@@ -65,18 +121,23 @@ def plot_label_distribution(df: pd.DataFrame, out_dir: Path) -> None:
     plt.close(fig)
 
 def _add_accuracy_scores(df: pd.DataFrame) -> pd.DataFrame:
-    scored = df.copy()
-    scored["score"] = scored["label"].map(LABEL_SCORES)
-    return scored.dropna(subset=["score"])
+    codes = df["label"].cat.codes.to_numpy()
+    mask = codes >= 0
+    return df.loc[mask].assign(score=_SCORE_BY_CODE[codes[mask]])
 
 
-def plot_overall_accuracy(df: pd.DataFrame, out_dir: Path) -> None:
+def score_validations(df: pd.DataFrame) -> pd.DataFrame:
     scored = _add_accuracy_scores(df)
+    column_names = scored["column_name"]
+    top_levels = {name: name.partition(".")[0] for name in column_names.cat.categories}
+    return scored.assign(top_level=pd.Categorical(column_names.map(top_levels)))
+
+
+def plot_overall_accuracy(scored: pd.DataFrame, out_dir: Path) -> None:
     if scored.empty:
         print("No scored rows found for overall accuracy plot.")
         return
     overall = scored["score"].mean()
-    sns.set_theme(style="whitegrid")
     fig, ax = plt.subplots(figsize=(4, 4))
     sns.barplot(x=["Overall"], y=[overall], ax=ax, color=sns.color_palette("crest", 1)[0])
     ax.set_ylim(0, 1)
@@ -87,22 +148,21 @@ def plot_overall_accuracy(df: pd.DataFrame, out_dir: Path) -> None:
     plt.close(fig)
 
 
-def plot_top_level_accuracy(df: pd.DataFrame, out_dir: Path, min_n: int = 5) -> None:
-    scored = _add_accuracy_scores(df)
+def plot_top_level_accuracy(scored: pd.DataFrame, out_dir: Path, min_n: int = 5) -> None:
     if scored.empty:
         print("No scored rows found for top-level accuracy plot.")
         return
-    scored = scored.assign(top_level=scored["column_name"].astype(str).str.split(".").str[0])
     summary = (
-        scored.groupby("top_level", as_index=False)
+        scored.groupby("top_level", as_index=False, observed=True)
         .agg(n=("score", "size"), accuracy=("score", "mean"))
-        .query("n >= @min_n")
+        .loc[lambda summary: summary["n"] >= min_n]
         .sort_values("accuracy", ascending=False)
+        # Plain strings, so seaborn does not draw unobserved categories.
+        .astype({"top_level": str})
     )
     if summary.empty:
         print("No top-level columns met min_n for accuracy plots.")
         return
-    sns.set_theme(style="whitegrid")
     fig, ax = plt.subplots(figsize=(8, 4))
     sns.barplot(
         data=summary,
@@ -122,24 +182,17 @@ def plot_top_level_accuracy(df: pd.DataFrame, out_dir: Path, min_n: int = 5) ->
     plt.close(fig)
 
 
-def plot_nested_accuracy(df: pd.DataFrame, out_dir: Path, min_n: int = 5) -> None:
-    scored = _add_accuracy_scores(df)
-    if scored.empty:
-        print("No scored rows found for nested accuracy plots.")
-        return
-    scored = scored.assign(top_level=scored["column_name"].astype(str).str.split(".").str[0])
-    for top_level, subset in scored.groupby("top_level"):
-        summary = (
-            subset.groupby("column_name", as_index=False)
-            .agg(n=("score", "size"), accuracy=("score", "mean"))
-            .query("n >= @min_n")
-            .sort_values("accuracy", ascending=False)
-        )
-        if summary.empty:
-            continue
-        fig_height = max(4, min(18, 0.35 * len(summary)))
-        sns.set_theme(style="whitegrid")
-        fig, ax = plt.subplots(figsize=(9, fig_height))
+def _set_report_theme() -> None:
+    sns.set_theme(style="whitegrid")
+
+
+def _save_nested_plots(groups: list[tuple[str, pd.DataFrame]], out_dir: Path) -> None:
+    # One figure is cleared and resized per top-level instead of a new one each.
+    fig = plt.figure()
+    for top_level, summary in groups:
+        fig.clear()
+        fig.set_size_inches(9, max(4, min(18, 0.35 * len(summary))))
+        ax = fig.add_subplot()
         sns.barplot(
             data=summary,
             y="column_name",
@@ -155,7 +208,40 @@ def plot_nested_accuracy(df: pd.DataFrame, out_dir: Path, min_n: int = 5) -> Non
         ax.set_title(f"Accuracy for {top_level} Columns")
         safe_name = top_level.replace("/", "_")
         save_plot(fig, out_dir, f"nested_accuracy_{safe_name}")
-        plt.close(fig)
+    plt.close(fig)
+
+
+def plot_nested_accuracy(scored: pd.DataFrame, out_dir: Path, min_n: int = 5) -> None:
+    if scored.empty:
+        print("No scored rows found for nested accuracy plots.")
+        return
+    # One grouped pass for every column, split per top-level afterwards.
+    summaries = (
+        scored.groupby(["top_level", "column_name"], observed=True)
+        .agg(n=("score", "size"), accuracy=("score", "mean"))
+        .reset_index()
+        .loc[lambda summary: summary["n"] >= min_n]
+        # Plain strings, so seaborn does not draw unobserved categories.
+        .astype({"column_name": str})
+    )
+    groups = [
+        (top_level, summary.sort_values("accuracy", ascending=False))
+        for top_level, summary in summaries.groupby("top_level", observed=True)
+        if not summary.empty
+    ]
+    workers = min(len(groups) // _PLOTS_PER_WORKER, os.cpu_count() or 1)
+    if workers <= 1:
+        _save_nested_plots(groups, out_dir)
+        return
+    # Rendering is CPU-bound and pyplot is not thread-safe, so large reports
+    # fan the plots out over processes, each reusing its own figure.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_set_report_theme,
+    ) as pool:
+        chunks = [groups[index::workers] for index in range(workers)]
+        list(pool.map(_save_nested_plots, chunks, [out_dir] * workers))
 
 
 def main() -> None:
@@ -169,10 +255,12 @@ def main() -> None:
     out_dir = Path(args.out)
 
     df = load_validations(input_path)
+    _set_report_theme()
     plot_label_distribution(df, out_dir)
-    plot_overall_accuracy(df, out_dir)
-    plot_top_level_accuracy(df, out_dir, min_n=args.min_n)
-    plot_nested_accuracy(df, out_dir, min_n=args.min_n)
+    scored = score_validations(df)
+    plot_overall_accuracy(scored, out_dir)
+    plot_top_level_accuracy(scored, out_dir, min_n=args.min_n)
+    plot_nested_accuracy(scored, out_dir, min_n=args.min_n)
 
     print(f"Saved plots to {out_dir}")
 
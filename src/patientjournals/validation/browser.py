@@ -94,7 +94,9 @@ def build_cloud_image_index(
 
 
 def _local_image_index(root: str | Path) -> dict[str, ValidationImageRef]:
-    paths = build_image_index(Path(root).expanduser())
+    paths = build_image_index(
+        Path(root).expanduser(), cache_dir=config.image_index_cache_dir or None
+    )
     return {
         name: ValidationImageRef(
             image_name=name,
@@ -137,6 +139,7 @@ class BrowserValidationSession:
         self.rows = load_dataset(self.dataset_path)
         self.datapoints = build_validation_datapoints(self.rows, self.image_index)
         self.results: list[dict[str, Any]] = []
+        self.saved_results = 0
         self.validated_pairs: set[tuple[str, str]] = set()
         self.selection_counts: dict[str, int] = {}
         self.scored_counts: dict[str, int] = {}
@@ -151,13 +154,7 @@ class BrowserValidationSession:
         if not self.rows:
             raise ValueError("Dataset is empty.")
         if not self.datapoints:
-            image_names = sorted(
-                {
-                    display_image_name(row)
-                    for row in self.rows
-                    if display_image_name(row)
-                }
-            )
+            image_names = sorted(set(filter(None, map(display_image_name, self.rows))))
             matched = len(set(image_names).intersection(self.image_index))
             raise ValueError(
                 "No validation datapoints could be built. "
@@ -366,10 +363,17 @@ class BrowserValidationSession:
             "image_uri",
             "session_id",
         ]
-        with open(self.csv_path, "w", newline="", encoding="utf-8") as handle:
-            writer = csv.DictWriter(handle, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.results)
+        # Saved after every decision, so only the new rows are appended
+        # rather than rewriting the whole file each time.
+        pending = self.results[self.saved_results:]
+        if pending:
+            mode = "a" if self.saved_results else "w"
+            with open(self.csv_path, mode, newline="", encoding="utf-8") as handle:
+                writer = csv.DictWriter(handle, fieldnames=fieldnames)
+                if not self.saved_results:
+                    writer.writeheader()
+                writer.writerows(pending)
+            self.saved_results = len(self.results)
         self.metadata_path = write_validation_metadata(
             run_dir=self.run_dir,
             csv_path=self.csv_path,
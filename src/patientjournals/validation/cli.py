@@ -1,11 +1,15 @@
 import argparse
 import csv
+import hashlib
 import json
 import math
+import os
 import random
 import secrets
+import time
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from tkinter import Tk, Label, Button, StringVar, messagebox, Frame, Canvas, Scrollbar, Entry
 from typing import Any, Literal, get_args, get_origin
@@ -18,6 +22,13 @@ from patientjournals.config import config
 from patientjournals.config.schemas import FrontPage
 from patientjournals.shared.field_classification import is_metadata_field as is_support_field
 from patientjournals.shared.identity import row_image_name
+from patientjournals.shared.preprocess import _write_cache_file
+from patientjournals.shared.tools import (
+    _flatten_row,
+    _json_loads,
+    _path_sort_key,
+    _scan_files,
+)
 from patientjournals.validation.sync import (
     upload_validation_run,
     write_validation_metadata,
@@ -43,16 +54,66 @@ class ValidationDatapoint:
     field_name: str
     field_value: object
 
-def build_image_index(root_dir: Path) -> dict[str, Any]:
-    index: dict[str, Any] = {}
-    for path in root_dir.rglob("*"):
-        if not path.is_file():
-            continue
-        name = path.name
-        if name in index:
-            continue
-        index[name] = path
-    return index
+
+_MTIME_SLACK_NS = 2_000_000_000
+
+
+def _match_any(_name: str) -> bool:
+    return True
+
+
+def _image_index_cache_path(root_dir: Path, cache_dir: str | Path) -> Path:
+    root_key = hashlib.sha256(os.fsencode(os.path.abspath(root_dir))).hexdigest()
+    return Path(cache_dir).expanduser() / f"image_index_{root_key[:24]}.json"
+
+
+def _cached_image_paths(cache_path: Path) -> dict[str, str] | None:
+    # Adding, removing or renaming an entry bumps its directory's mtime, so
+    # the index is current while every scanned directory keeps its mtime.
+    try:
+        cached = _json_loads(cache_path.read_bytes())
+        for directory, mtime_ns in cached["dirs"].items():
+            if os.stat(directory).st_mtime_ns != mtime_ns:
+                return None
+        return cached["index"]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def build_image_index(
+    root_dir: Path,
+    cache_dir: str | Path | None = None,
+) -> dict[str, Any]:
+    cache_path = _image_index_cache_path(root_dir, cache_dir) if cache_dir else None
+    if cache_path is not None:
+        cached = _cached_image_paths(cache_path)
+        if cached is not None:
+            return {name: Path(path) for name, path in cached.items()}
+
+    # Same parallel scandir walk as list_input_files, matching every file. The
+    # walk order depends on thread timing, so a basename found in several
+    # folders maps to the path that sorts first (a/x/p.png before c/y/p.png).
+    dirs: list[str] | None = [] if cache_path is not None else None
+    scan_started_ns = time.time_ns()
+    paths: dict[str, str] = {}
+    for path in _scan_files(str(root_dir), _match_any, recursive=True, dirs=dirs):
+        name = os.path.basename(path)
+        seen = paths.get(name)
+        if seen is None or _path_sort_key(path) < _path_sort_key(seen):
+            paths[name] = path
+
+    if cache_path is not None:
+        try:
+            mtimes = {directory: os.stat(directory).st_mtime_ns for directory in dirs}
+            # A directory changed mid-scan may not be reflected in paths; the
+            # slack covers filesystems with coarse mtimes.
+            if max(mtimes.values(), default=0) < scan_started_ns - _MTIME_SLACK_NS:
+                payload = json.dumps({"dirs": mtimes, "index": paths})
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                _write_cache_file(cache_path, payload.encode("utf-8"))
+        except OSError:
+            pass
+    return {name: Path(path) for name, path in paths.items()}
 
 
 def load_dataset(path: Path) -> list[dict]:
@@ -60,20 +121,19 @@ def load_dataset(path: Path) -> list[dict]:
         df = pd.read_csv(path, sep="$")
         return df.to_dict(orient="records")
     if path.suffix.lower() == ".jsonl":
-        rows = []
-        with open(path, "r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                rows.append(json.loads(line))
-        return rows
+        with open(path, "rb") as handle:
+            return [_json_loads(line) for line in handle if line.strip()]
     raise ValueError(f"Unsupported dataset format: {path}")
 
 
 def flatten_row(row: dict) -> dict:
-    flat = pd.json_normalize(row, sep=".").to_dict(orient="records")
-    return flat[0] if flat else {}
+    # Same keys and order as pd.json_normalize(row, sep=".") (top-level
+    # scalars first), without building a DataFrame per row.
+    flat = {key: value for key, value in row.items() if not isinstance(value, dict)}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            _flatten_row(value, f"{key}.", flat)
+    return flat
 
 
 def eligible_flat_fields(row: dict) -> list[tuple[str, object]]:
@@ -82,7 +142,7 @@ def eligible_flat_fields(row: dict) -> list[tuple[str, object]]:
     for key, value in flat.items():
         if not _is_validation_schema_field(key):
             continue
-        if value is None or (isinstance(value, float) and pd.isna(value)):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
             continue
         if isinstance(value, (dict, list)):
             continue
@@ -183,7 +243,7 @@ def choose_balanced_ucb_datapoint(
 def _stringify_value(value: object) -> str:
     if value is None:
         return ""
-    if isinstance(value, float) and pd.isna(value):
+    if isinstance(value, float) and math.isnan(value):
         return ""
     return str(value)
 
@@ -209,11 +269,22 @@ def _is_metadata_field(path: str) -> bool:
 
 
 def _is_validation_schema_field(path: str) -> bool:
-    return not _is_metadata_field(path) and _get_field_type(path) is not None
+    return _is_schema_field_of(_schema_model(), path)
+
+
+@lru_cache(maxsize=None)
+def _is_schema_field_of(model: type[BaseModel], path: str) -> bool:
+    # Every row repeats the same flat keys; classify each key once per model.
+    return not _is_metadata_field(path) and _model_field_type(model, path) is not None
 
 
 def _get_field_type(path: str) -> object | None:
-    current = _schema_model()
+    return _model_field_type(_schema_model(), path)
+
+
+@lru_cache(maxsize=None)
+def _model_field_type(model: type[BaseModel], path: str) -> object | None:
+    current = model
     field_type: object | None = None
     for part in path.split("."):
         if not hasattr(current, "model_fields"):
@@ -233,16 +304,21 @@ def _get_field_type(path: str) -> object | None:
             current = None
     return field_type
 
+@lru_cache(maxsize=None)
+def _field_adapter(field_type: object) -> TypeAdapter:
+    # Building a TypeAdapter compiles a core schema; reuse it per field type.
+    return TypeAdapter(field_type)
+
 def _parse_corrected_value(field_name: str, text: str) -> object:
     stripped = text.strip()
     if stripped == "":
         return ""
     field_type = _get_field_type(field_name)
-    if field_type is None:
+    # Most schema leaves are plain str, which validation returns unchanged.
+    if field_type is None or field_type is str:
         return stripped
     try:
-        adapter = TypeAdapter(field_type)
-        return adapter.validate_python(stripped)
+        return _field_adapter(field_type).validate_python(stripped)
     except ValidationError as exc:
         raise ValueError(f"Value '{stripped}' is invalid for {field_name}.") from exc
 
@@ -275,7 +351,9 @@ class ValidatorApp:
         self.seed = secrets.randbits(64)
         self.rng = random.Random(self.seed)
         self.rows = load_dataset(dataset_path)
-        self.image_index = build_image_index(image_root)
+        self.image_index = build_image_index(
+            image_root, cache_dir=config.image_index_cache_dir or None
+        )
         self.datapoints = build_validation_datapoints(self.rows, self.image_index)
         self.results: list[dict] = []
         self.validated_pairs: set[tuple[str, str]] = set()
@@ -287,6 +365,7 @@ class ValidatorApp:
         self.current_field = None
         self.current_image = None
         self.current_datapoint: ValidationDatapoint | None = None
+        self.pending_render = None
         self.run_dir = self._create_run_dir()
         self.log_path = self.run_dir / "validation.log"
 
@@ -579,10 +658,12 @@ class ValidatorApp:
 
     def show_sample(self):
         self.original_image = Image.open(self.current_image)
+        self.image_size = self.original_image.size
+        self.image_drafted = False
         self.reset_zoom()
 
         field_name, field_value = self.current_field
-        file_name = display_image_name(self.current_row)
+        file_name = self.current_datapoint.image_name
         self.field_text.set(f"{file_name}\n{field_name}: {field_value}")
         self.original_field_raw = field_value
         self.original_field_value = _stringify_value(field_value)
@@ -595,7 +676,7 @@ class ValidatorApp:
         if not hasattr(self, "original_image") or self.original_image is None:
             return
         max_w, max_h = self._get_image_bounds()
-        img_w, img_h = self.original_image.size
+        img_w, img_h = self.image_size
         fit = min(max_w / img_w, max_h / img_h, 1.0)
         self.zoom = max(0.1, fit)
         self.render_image()
@@ -604,13 +685,35 @@ class ValidatorApp:
         if not hasattr(self, "original_image") or self.original_image is None:
             return
         self.zoom = max(0.1, min(5.0, self.zoom * factor))
+        # Wheel and pinch events arrive in bursts; render once per frame at
+        # the latest zoom level instead of resizing on every tick.
+        if self.pending_render is None:
+            self.pending_render = self.root.after(16, self._render_pending)
+
+    def _render_pending(self) -> None:
+        self.pending_render = None
         self.render_image()
 
+    def _display_source(self, scaled_w: int, scaled_h: int) -> Image.Image:
+        # The first (fit) render lets the JPEG decoder subsample to the
+        # display size; zooming past the drafted size reopens the full scan.
+        img = self.original_image
+        if not self.image_drafted:
+            img.draft(None, (scaled_w, scaled_h))
+            self.image_drafted = True
+        elif img.size != self.image_size and (
+            img.size[0] < scaled_w or img.size[1] < scaled_h
+        ):
+            img = self.original_image = Image.open(self.current_image)
+        return img
+
     def render_image(self) -> None:
-        img_w, img_h = self.original_image.size
+        img_w, img_h = self.image_size
         scaled_w = max(1, int(img_w * self.zoom))
         scaled_h = max(1, int(img_h * self.zoom))
-        display_img = self.original_image.resize((scaled_w, scaled_h), Image.LANCZOS)
+        display_img = self._display_source(scaled_w, scaled_h).resize(
+            (scaled_w, scaled_h), Image.LANCZOS, reducing_gap=2.0
+        )
         self.photo = ImageTk.PhotoImage(display_img)
         self.canvas.delete("all")
         self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
@@ -627,7 +730,7 @@ class ValidatorApp:
             messagebox.showinfo("Corrections disabled", "Run with --corrections to enable edits.")
             return
         field_name, _ = self.current_field
-        file_name = display_image_name(self.current_row)
+        file_name = self.current_datapoint.image_name
         dataset_name = self.dataset_path.name
         decided_at = datetime.now().isoformat(timespec="seconds")
         corrected_field = None
@@ -0,0 +1,35 @@
+import asyncio
+
+from google.genai import errors
+
+from patientjournals.shared.api_retry import AsyncRateLimiter, is_retryable_api_error
+
+
+def test_rate_limiter_spaces_request_starts() -> None:
+    async def run() -> list[float]:
+        limiter = AsyncRateLimiter(max_rate=4, time_period=0.2)
+        loop = asyncio.get_running_loop()
+        starts: list[float] = []
+
+        async def one() -> None:
+            async with limiter:
+                starts.append(loop.time())
+
+        await asyncio.gather(*(one() for _ in range(4)))
+        return starts
+
+    starts = sorted(asyncio.run(run()))
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
+
+
+def test_retryable_detection_prefers_status_codes() -> None:
+    unavailable = errors.ServerError(503, {"error": {"status": "UNAVAILABLE"}})
+    bad_request = errors.ClientError(
+        400, {"error": {"message": "Deadline exceeded parsing schema"}}
+    )
+
+    assert is_retryable_api_error(unavailable)
+    assert not is_retryable_api_error(bad_request)
+    assert is_retryable_api_error(ConnectionResetError("peer reset"))
+    assert is_retryable_api_error(RuntimeError("429 rate limit"))
@@ -1,7 +1,11 @@
+import asyncio
 from types import SimpleNamespace
 
+from google import genai
+
 from patientjournals.batch import client as batch_client
 from patientjournals.config import config
+from patientjournals.shared.generation_spec import live_http_options
 
 
 def test_get_batch_client_supports_adc(monkeypatch) -> None:
@@ -32,3 +36,19 @@ def test_get_batch_client_supports_adc(monkeypatch) -> None:
     assert created["credentials"] is fake_credentials
     assert created["project"] == "adc-project"
     assert created["location"] == "global"
+
+
+def test_live_http_options_give_genai_a_pooled_httpx_client(monkeypatch) -> None:
+    monkeypatch.setattr(config, "api_concurrent_tasks", 64)
+    options = live_http_options()
+    http_client = options.httpx_async_client
+
+    api_client = genai.Client(api_key="test-key", http_options=options)._api_client
+
+    assert options.async_client_args is None
+    assert api_client._async_httpx_client is http_client
+    assert not api_client._use_aiohttp()
+    pool = http_client._transport._pool
+    assert pool._max_connections == 128
+    assert pool._max_keepalive_connections == 64
+    asyncio.run(http_client.aclose())
@@ -298,3 +298,16 @@ def test_api_key_recovery_failure_reason_includes_exception_detail(monkeypatch)
     )
     assert "400 INVALID_ARGUMENT" in results[0].failure_reason
     assert "gemini-x is not supported" in results[0].failure_reason
+
+
+def test_recovery_parse_prefers_sdk_parsed_payload(monkeypatch) -> None:
+    monkeypatch.setattr(config, "output_model", SimpleOutput)
+    response = SimpleNamespace(
+        text=json.dumps({"value": "from-text"}),
+        candidates=[],
+        parsed={"value": "from-parsed"},
+    )
+
+    _metadata, parsed_model = retrieve._parse_recovery_response(response)
+
+    assert parsed_model == SimpleOutput(value="from-parsed")
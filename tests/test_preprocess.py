@@ -0,0 +1,118 @@
+import os
+
+from PIL import Image, ImageEnhance
+
+from patientjournals.shared.preprocess import (
+    cached_preprocess_image_with_metadata,
+    crop_margins,
+    enhance_contrast,
+    image_to_bytes,
+    preprocess_image_with_metadata,
+    resize_and_crop,
+)
+
+
+def test_preprocess_drafts_large_jpeg_but_keeps_target_size(tmp_path) -> None:
+    source = tmp_path / "page.jpg"
+    Image.new("RGB", (1600, 1200), (200, 180, 160)).save(source, format="JPEG")
+
+    _, mime_type, metadata = preprocess_image_with_metadata(
+        source,
+        max_dim=300,
+        output_format="PNG",
+    )
+
+    assert mime_type == "image/png"
+    assert metadata["original_width"] == 1600
+    assert metadata["original_height"] == 1200
+    assert metadata["resized_width"] == 300
+    assert metadata["resized_height"] == 225
+
+
+def test_cached_preprocess_reuses_bytes_for_same_settings(tmp_path) -> None:
+    source = tmp_path / "page.png"
+    cache_dir = tmp_path / "cache"
+    Image.new("RGB", (40, 30), (10, 20, 30)).save(source, format="PNG")
+
+    first_bytes, _, first_meta = cached_preprocess_image_with_metadata(
+        source, cache_dir=cache_dir, max_dim=20
+    )
+    second_bytes, mime_type, second_meta = cached_preprocess_image_with_metadata(
+        source, cache_dir=cache_dir, max_dim=20
+    )
+    _, _, other_settings_meta = cached_preprocess_image_with_metadata(
+        source, cache_dir=cache_dir, max_dim=10
+    )
+
+    assert first_meta["cache_hit"] is False
+    assert second_meta["cache_hit"] is True
+    assert second_bytes == first_bytes
+    assert mime_type == "image/png"
+    assert other_settings_meta["cache_hit"] is False
+    assert other_settings_meta["resized_width"] == 10
+
+
+def test_cached_preprocess_evicts_least_recently_used_pages(tmp_path) -> None:
+    cache_dir = tmp_path / "cache"
+    sources = []
+    for index in range(3):
+        source = tmp_path / f"page_{index}.png"
+        Image.effect_noise((40, 40), 64).convert("RGB").save(source, format="PNG")
+        sources.append(source)
+
+    page_bytes, _, _ = cached_preprocess_image_with_metadata(
+        sources[0], cache_dir=cache_dir, max_dim=40
+    )
+    cap = len(page_bytes) * 2 + len(page_bytes) // 2
+    old = next(cache_dir.glob("*.bin"))
+    os.utime(old, ns=(0, 10**9))
+    cached_preprocess_image_with_metadata(
+        sources[1], cache_dir=cache_dir, cache_max_bytes=cap, max_dim=40
+    )
+    cached_preprocess_image_with_metadata(
+        sources[2], cache_dir=cache_dir, cache_max_bytes=cap, max_dim=40
+    )
+    evicted = not old.exists() and not old.with_suffix(".json").exists()
+    _, _, first_again = cached_preprocess_image_with_metadata(
+        sources[0], cache_dir=cache_dir, cache_max_bytes=cap, max_dim=40
+    )
+
+    assert evicted
+    assert first_again["cache_hit"] is False
+    assert len(list(cache_dir.glob("*.bin"))) == 2
+    assert len(list(cache_dir.glob("*.json"))) == 2
+
+
+def test_image_to_bytes_accepts_jpg_alias_and_quality() -> None:
+    img = Image.effect_noise((64, 64), 64).convert("RGB")
+
+    high, mime_type = image_to_bytes(img, format_hint="JPG", quality=95)
+    low, _ = image_to_bytes(img, format_hint="jpeg", quality=30)
+
+    assert mime_type == "image/jpeg"
+    assert len(low) < len(high)
+
+
+def test_enhance_contrast_matches_pillow_enhancer() -> None:
+    img = Image.effect_noise((80, 60), 70).convert("RGB")
+
+    for factor in (0.7, 1.1, 1.5, 2.3):
+        expected = ImageEnhance.Contrast(img).enhance(factor)
+        assert enhance_contrast(img, factor).tobytes() == expected.tobytes()
+
+
+def test_resize_and_crop_applies_margins_in_resized_pixels() -> None:
+    img = Image.new("RGB", (800, 600), (255, 255, 255))
+
+    cropped, resized_size = resize_and_crop(img, max_dim=400, margins=(50, 0, 0, 25))
+
+    assert resized_size == (400, 300)
+    assert cropped.size == (350, 275)
+
+
+def test_noop_crop_and_resize_return_the_same_image() -> None:
+    img = Image.new("RGB", (120, 80), (255, 255, 255))
+
+    assert crop_margins(img) is img
+    assert resize_and_crop(img, max_dim=200)[0] is img
+    assert crop_margins(img, left=10).size == (110, 80)
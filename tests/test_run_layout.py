@@ -1,4 +1,5 @@
 import json
+import os
 
 from patientjournals.shared import run_layout as rl
 
@@ -28,6 +29,17 @@ def test_iter_run_dirs_reads_both_layouts(tmp_path) -> None:
     assert names == {"20260102_000000", "submit_20260101_000000"}
 
 
+def test_latest_run_dir_picks_most_recent(tmp_path) -> None:
+    older = _mk(tmp_path / "submits" / "20260102_000000")
+    newer = _mk(tmp_path / "submit_20260101_000000")
+    os.utime(older, (1_000, 1_000))
+    os.utime(newer, (2_000, 2_000))
+
+    assert rl.latest_run_dir(tmp_path, "submit") == newer
+    assert rl.latest_run_dir(tmp_path, "retrieve") is None
+    assert rl.latest_run_dir(tmp_path / "missing", "submit") is None
+
+
 def test_iter_all_run_dirs(tmp_path) -> None:
     _mk(tmp_path / "submits" / "20260102_000000")
     _mk(tmp_path / "retrieves" / "20260101_120000")
@@ -1,9 +1,14 @@
 import json
+from pathlib import Path
 
 import pandas as pd
 
+from patientjournals.shared.identity import image_names_with_duplicates
 from patientjournals.shared.tools import (
+    DatasetWriter,
     build_image_name_id_set,
+    build_path_id_set,
+    filter_dataset_by_image_names,
     filter_dataset_by_input_ids,
     flush_rows,
     list_input_files,
@@ -79,6 +84,75 @@ def test_filter_dataset_by_input_ids_jsonl(tmp_path) -> None:
     ]
 
 
+def test_filter_dataset_by_image_names_jsonl_skips_unselected_rows(tmp_path) -> None:
+    src = tmp_path / "dataset.jsonl"
+    rows = [
+        {"image_name": "a.png", "value": 1},
+        {"image_name": "b.png", "value": 2},
+        {"image_name": "nested/c.png", "value": 3},
+        {"file_name": "/data/d.png", "value": 4},
+    ]
+    src.write_text(
+        "\n".join(json.dumps(row) for row in rows) + "\n{not json\n",
+        encoding="utf-8",
+    )
+    dest = tmp_path / "filtered.jsonl"
+
+    kept = filter_dataset_by_input_ids(
+        src,
+        dest,
+        input_ids={"a.png", "c.png", "d.png"},
+        output_format="jsonl",
+    )
+
+    values = [json.loads(line)["value"] for line in dest.read_text().splitlines()]
+    assert kept == 3
+    assert values == [1, 3, 4]
+
+
+
+def test_filter_dataset_by_image_names_jsonl_ignores_nested_image_name(tmp_path) -> None:
+    src = tmp_path / "dataset.jsonl"
+    rows = [
+        {"source_path": "x/a.png", "extra": {"image_name": "other.png"}},
+        {"image_name": "b.png", "note": "mentions a.png"},
+        {"file_name": "gs://bucket/pages/\u00e6.png"},
+    ]
+    src.write_text("\n".join(json.dumps(row) for row in rows) + "\n", encoding="utf-8")
+    dest = tmp_path / "filtered.jsonl"
+
+    kept = filter_dataset_by_image_names(
+        src, dest, {"a.png", "\u00e6.png"}, output_format="jsonl"
+    )
+
+    kept_rows = [json.loads(line) for line in dest.read_text(encoding="utf-8").splitlines()]
+    assert kept == 2
+    assert [row["image_name"] for row in kept_rows] == ["a.png", "\u00e6.png"]
+
+def test_filter_dataset_by_input_ids_csv_uses_identity_fallbacks(tmp_path) -> None:
+    src = tmp_path / "dataset.csv"
+    pd.DataFrame(
+        [
+            {"image_name": "a.png", "file_name": "/data/a.png", "value": 1},
+            {"image_name": None, "file_name": "/data/b.png", "value": 2},
+            {"image_name": "nested/c.png", "file_name": None, "value": 3},
+            {"image_name": "d.png", "file_name": "/data/d.png", "value": 4},
+        ]
+    ).to_csv(src, index=False, sep="$")
+    dest = tmp_path / "filtered.csv"
+
+    kept = filter_dataset_by_input_ids(
+        src,
+        dest,
+        input_ids={"a.png", "b.png", "c.png"},
+        output_format="csv",
+    )
+
+    filtered = pd.read_csv(dest, sep="$")
+    assert kept == 3
+    assert filtered["value"].tolist() == [1, 2, 3]
+
+
 def test_load_existing_dataset_csv(tmp_path) -> None:
     path = tmp_path / "dataset.csv"
     pd.DataFrame(
@@ -148,3 +222,154 @@ def test_build_image_name_id_set_uses_basename_identity(tmp_path) -> None:
     ]
 
     assert build_image_name_id_set(paths) == {"a.png", "b.png"}
+
+
+def test_build_path_id_set_adds_target_folder_candidates(tmp_path) -> None:
+    ids = build_path_id_set(
+        [str(tmp_path / "abs.png"), "rel/a.png", "data/b.png"],
+        target_folder="data",
+    )
+
+    assert str((tmp_path / "abs.png").resolve()) in ids
+    assert str(Path("rel/a.png").resolve()) in ids
+    assert str(Path("data/rel/a.png").resolve()) in ids
+    assert str(Path("data/b.png").resolve()) in ids
+    assert str(Path("data/data/b.png").resolve()) not in ids
+
+
+def test_image_names_with_duplicates_single_pass() -> None:
+    names, duplicates = image_names_with_duplicates(
+        ["one/a.png", "gs://bucket/two/a.png", "b.png", "", None]
+    )
+
+    assert names == {"a.png", "b.png"}
+    assert duplicates == {"a.png"}
+
+
+def test_dataset_writer_keeps_csv_columns_across_writes(tmp_path) -> None:
+    path = tmp_path / "dataset.csv"
+
+    with DatasetWriter(path, "csv") as writer:
+        writer.write_rows([{"image_name": "a.png", "value": "ok", "failed": False}])
+        writer.write_rows([{"image_name": "b.png", "failed": True}])
+
+    assert writer.rows_written == 2
+    frame = pd.read_csv(path, sep="$")
+    assert list(frame.columns) == ["image_name", "value", "failed"]
+    assert frame.loc[1, "image_name"] == "b.png"
+
+
+def test_dataset_writer_flattens_nested_csv_rows_against_header(tmp_path) -> None:
+    path = tmp_path / "dataset.csv"
+
+    with DatasetWriter(path, "csv") as writer:
+        writer.write_rows([{"image_name": "a.png", "ward": None, "patient": {"name": "A"}}])
+        writer.write_rows(
+            [
+                {"image_name": "b.png", "ward": {"name": "W"}, "patient": {"name": "B"}},
+                {"image_name": "c.png", "patient": {}},
+            ]
+        )
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines == ["image_name$ward$patient.name", "a.png$$A", "b.png$$B", "c.png$$"]
+
+
+def test_csv_header_follows_file_state_not_caller_flag(tmp_path) -> None:
+    path = tmp_path / "dataset.csv"
+
+    flush_rows([{"image_name": "a.png", "value": 1}], str(path), True, "csv")
+    with DatasetWriter(path, "csv", header_written=False) as writer:
+        writer.write_rows([{"value": 2, "image_name": "b.png"}])
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines == ["image_name$value", "a.png$1", "b.png$2"]
+
+
+def test_dataset_writer_appends_jsonl_lines(tmp_path) -> None:
+    path = tmp_path / "dataset.jsonl"
+
+    with DatasetWriter(path, "jsonl") as writer:
+        writer.write_rows([{"image_name": "a.png"}, {"image_name": "b.png"}])
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["image_name"] for line in lines] == ["a.png", "b.png"]
+
+
+def test_jsonl_rows_with_nan_round_trip(tmp_path) -> None:
+    path = tmp_path / "dataset.jsonl"
+
+    with DatasetWriter(path, "jsonl") as writer:
+        writer.write_rows([{"image_name": "a.png", "score": float("nan")}])
+
+    fmt, image_names, row_count = load_existing_dataset(path)
+    assert (fmt, image_names, row_count) == ("jsonl", {"a.png"}, 1)
+
+
+def test_csv_row_image_names_takes_bare_names_without_row_fallback(
+    tmp_path, monkeypatch
+) -> None:
+    import patientjournals.shared.tools as tools
+
+    path = tmp_path / "dataset.csv"
+    path.write_text("image_name$value\na.png$1\ndir/b.png$2\n", encoding="utf-8")
+    df = pd.read_csv(path, sep="$")
+    fallback_rows = []
+    original = tools.row_image_name
+
+    def record(row):
+        fallback_rows.append(row)
+        return original(row)
+
+    monkeypatch.setattr(tools, "row_image_name", record)
+
+    names = tools._csv_row_image_names(df)
+
+    assert names.tolist() == ["a.png", "b.png"]
+    assert fallback_rows == [{"image_name": "dir/b.png"}]
+
+
+def test_flush_rows_csv_matches_pandas_to_csv(tmp_path) -> None:
+    rows = [
+        {
+            "image_name": "a.png",
+            "patient": {"name": "Ann", "address": {"city": "Aarhus"}},
+            "note": "x$y",
+            "score": float("nan"),
+        },
+        {"image_name": "b.png", "patient": {"name": None}, "note": None, "score": 0.5},
+    ]
+    out = tmp_path / "dataset.csv"
+    expected = tmp_path / "expected.csv"
+
+    flush_rows(rows, str(out), header_written=False, output_format="csv")
+    flush_rows(rows[1:], str(out), header_written=True, output_format="csv")
+    pd.json_normalize(rows + rows[1:], sep=".").to_csv(expected, index=False, sep="$")
+
+    assert out.read_bytes() == expected.read_bytes()
+
+
+def test_dataset_writer_jsonl_encoding_round_trips(tmp_path) -> None:
+    from datetime import date, datetime
+
+    path = tmp_path / "dataset.jsonl"
+    row = {
+        "image_name": "æ.png",
+        "patient": {"born": date(1901, 2, 3), "tags": {1}},
+        "created": datetime(2024, 1, 2, 3, 4, 5),
+        "score": 0.5,
+        "note": None,
+    }
+
+    with DatasetWriter(path, "jsonl") as writer:
+        writer.write_rows([row])
+
+    line = path.read_text(encoding="utf-8")
+    assert line.startswith('{"image_name":"æ.png",')
+    assert json.loads(line) == {
+        "image_name": "æ.png",
+        "patient": {"born": "1901-02-03", "tags": [1]},
+        "created": "2024-01-02T03:04:05",
+        "score": 0.5,
+        "note": None,
+    }
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import json
+import os
 import random
+from pathlib import Path
+
+import pandas as pd
 
 from patientjournals.validation.cli import (
+    build_image_index,
     build_validation_datapoints,
     choose_balanced_ucb_datapoint,
     choose_random_datapoint,
     eligible_flat_fields,
+    flatten_row,
 )
 from patientjournals.validation import browser as browser_validation
 
@@ -157,3 +163,50 @@ def test_browser_validation_uses_signed_cloud_url_without_persisting_it(
     assert signed_calls[0]["method"] == "GET"
     assert "https://signed.example" not in output
     assert "gs://encrypted-bucket/pages/run/a.png" in output
+
+
+def test_flatten_row_matches_json_normalize_order() -> None:
+    row = {
+        "patient": {"name": "A", "age": {"number": 12}, "extra": {}},
+        "image_name": "a.png",
+        "notes": [{"x": 1}],
+        "empty": {},
+        "fk_info": None,
+    }
+
+    expected = pd.json_normalize(row, sep=".").to_dict(orient="records")[0]
+
+    assert list(flatten_row(row).items()) == list(expected.items())
+
+
+def test_image_index_cache_is_reused_until_a_directory_changes(tmp_path) -> None:
+    root = tmp_path / "images"
+    nested = root / "box1" / "scan"
+    nested.mkdir(parents=True)
+    (nested / "a.png").write_bytes(b"a")
+    for directory in (nested, root / "box1", root):
+        os.utime(directory, ns=(0, 10**9))
+    cache_dir = tmp_path / "cache"
+
+    first = build_image_index(root, cache_dir=cache_dir)
+    [cache_file] = cache_dir.iterdir()
+    payload = json.loads(cache_file.read_text())
+    payload["index"] = {"cached.png": "from-cache.png"}
+    cache_file.write_text(json.dumps(payload))
+    cached = build_image_index(root, cache_dir=cache_dir)
+    (nested / "b.png").write_bytes(b"b")
+    rescanned = build_image_index(root, cache_dir=cache_dir)
+
+    assert first == {"a.png": nested / "a.png"}
+    assert cached == {"cached.png": Path("from-cache.png")}
+    assert rescanned == {"a.png": nested / "a.png", "b.png": nested / "b.png"}
+
+
+def test_image_index_maps_duplicate_basenames_to_first_sorted_path(tmp_path) -> None:
+    for folder in ("a/x", "c/y", "c/y/z"):
+        (tmp_path / folder).mkdir(parents=True)
+        (tmp_path / folder / "dup2.png").write_bytes(b"x")
+
+    index = build_image_index(tmp_path)
+
+    assert index == {"dup2.png": tmp_path / "a" / "x" / "dup2.png"}